@@ -1,9 +1,15 @@
 # Standard library imports
 import calendar
 import dateutil.parser as parser
+from dateutil.utils import epoch_millis
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import json
+import os
 import re
+import threading
 import time
+import urllib.parse
 
 # Third party imports
 import feedparser
@@ -11,8 +17,141 @@ import requests
 
 # env variable for logging
 env = ""
-		
-def classify_text(nlu_url, nlu_apikey, classify_model, text):
+
+# Feed fetching limits: total concurrent downloads, concurrent downloads per host, and seconds before giving up on a feed
+FETCH_MAX_WORKERS = 16
+FETCH_PER_HOST_LIMIT = 4
+FETCH_TIMEOUT = 30
+
+# Response headers feedparser needs when it is handed raw bytes instead of a URL
+FETCH_PASSTHROUGH_HEADERS = ("content-type", "content-language", "etag", "last-modified")
+
+# The only feed and entry fields iter_articles reads; feedparser skips every other element (content, enclosures, media, ...)
+PARSE_FIELDS = ["title", "link", "published", "language"]
+
+# The parse of a feed marked newest_first in the feed list ends at the first entry published this long before the 24 hour window starts,
+# as everything after it is older still. Other feeds (sticky posts, unordered archives) are always parsed in full. The slack covers dates feedparser reads differently from get_UTC_time, such as zone names dateutil does not know.
+PARSE_SINCE_SLACK = timedelta(hours = 14)
+
+# Date strings whose parse get_UTC_time keeps in memory. Feeds repeat the same few hundred timestamps within a run and, while the
+# action stays warm, across runs.
+DATE_PARSE_CACHE_SIZE = 4096
+
+# File holding each feed's ETag / Last-Modified validators between runs. /tmp survives warm invocations of the action.
+VALIDATOR_STORE_PATH = "/tmp/parse_feed_validators.json"
+
+# NLU classification limits: concurrent requests sharing one pooled session, and seconds before giving up on a request
+NLU_MAX_WORKERS = 8
+NLU_TIMEOUT = 30
+
+# File holding classification results between runs, how long a result stays valid (seconds), and how many results are kept
+CLASSIFICATION_CACHE_PATH = "/tmp/parse_feed_classifications.json"
+CLASSIFICATION_CACHE_TTL = 7 * 24 * 60 * 60
+CLASSIFICATION_CACHE_MAX_ENTRIES = 20000
+
+# Translation limits: titles sent per request, and seconds before giving up on a request
+TRANSLATE_BATCH_SIZE = 50
+TRANSLATE_TIMEOUT = 30
+
+# File holding translated titles between runs, how long a translation stays valid (seconds), and how many translations are kept
+TRANSLATION_CACHE_PATH = "/tmp/parse_feed_translations.json"
+TRANSLATION_CACHE_TTL = 7 * 24 * 60 * 60
+TRANSLATION_CACHE_MAX_ENTRIES = 20000
+
+# SQL DB lookup limits: concurrent requests, seconds before giving up on a request, and retries on connection or server errors
+SQL_DB_MAX_WORKERS = 8
+SQL_DB_TIMEOUT = 30
+SQL_DB_RETRIES = 3
+
+# Feed language codes mapped to the translate endpoint's source_lang
+TRANSLATE_LANGUAGE_MAPPING = {
+	"ger": "DE",
+}
+
+
+# @DEV: On-disk cache of API results keyed by (namespace, normalized text), so text seen on an earlier run is not sent again.
+# Entries expire after ttl seconds and the oldest are dropped once there are more than max_entries.
+class ResultCache:
+
+	def __init__(self, path, ttl, max_entries):
+		self.path = path
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self.hits = 0
+		self.misses = 0
+		# namespace -> normalized text -> [stored_at, result]
+		self.entries = {}
+		self.lock = threading.Lock()
+		self.load()
+
+	@staticmethod
+	def normalize(text):
+		return text
+
+	def load(self):
+		if not self.path or not os.path.exists(self.path):
+			return
+		try:
+			with open(self.path) as f:
+				self.entries = json.load(f)
+		except Exception as ex:
+			print("*** " + env + " ERROR LOADING CACHE:", self.path, str(ex))
+			self.entries = {}
+
+	# @RET: Returns the cached result for text under namespace, or None if there is no fresh entry
+	def get(self, namespace, text):
+		now = time.time()
+		with self.lock:
+			entry = self.entries.get(namespace, {}).get(self.normalize(text))
+			if entry is None or now - entry[0] > self.ttl:
+				self.misses += 1
+				return None
+			self.hits += 1
+			return entry[1]
+
+	def put(self, namespace, text, result):
+		with self.lock:
+			self.entries.setdefault(namespace, {})[self.normalize(text)] = [time.time(), result]
+
+	# @DEV: Drops expired entries, trims to max_entries keeping the newest, and writes the cache back atomically.
+	def save(self):
+		if not self.path:
+			return
+		now = time.time()
+		with self.lock:
+			live = [(entry[0], namespace, text, entry) for namespace, texts in self.entries.items() for text, entry in texts.items() if now - entry[0] <= self.ttl]
+			live.sort(key=lambda row: row[0], reverse=True)
+			self.entries = {}
+			for _, namespace, text, entry in live[:self.max_entries]:
+				self.entries.setdefault(namespace, {})[text] = entry
+			tmp_path = self.path + ".tmp"
+			try:
+				with open(tmp_path, "w") as f:
+					json.dump(self.entries, f)
+				os.replace(tmp_path, self.path)
+			except Exception as ex:
+				print("*** " + env + " ERROR SAVING CACHE:", self.path, str(ex))
+
+
+# @DEV: classify_text results keyed by (classify_model, strip_characters(title.lower())).
+class ClassificationCache(ResultCache):
+
+	def __init__(self, path=CLASSIFICATION_CACHE_PATH, ttl=CLASSIFICATION_CACHE_TTL, max_entries=CLASSIFICATION_CACHE_MAX_ENTRIES):
+		super().__init__(path, ttl, max_entries)
+
+	@staticmethod
+	def normalize(text):
+		return strip_characters(text.lower())
+
+
+# @DEV: Translated titles keyed by (source_lang, title).
+class TranslationCache(ResultCache):
+
+	def __init__(self, path=TRANSLATION_CACHE_PATH, ttl=TRANSLATION_CACHE_TTL, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+		super().__init__(path, ttl, max_entries)
+
+
+def classify_text(nlu_url, nlu_apikey, classify_model, text, session=None):
 
 	URL = nlu_url + "/v1/analyze?version=2022-04-07"
 	headers = {"Content-Type":"application/json"}
@@ -22,7 +161,7 @@ def classify_text(nlu_url, nlu_apikey, classify_model, text):
 					"model":classify_model}}}
 	result_map = {}
 	try:
-		r = requests.post(URL, auth=("apikey",nlu_apikey), headers=headers, json=data)
+		r = (session or requests).post(URL, auth=("apikey",nlu_apikey), headers=headers, json=data, timeout=NLU_TIMEOUT)
 		r.raise_for_status()
 		for class_found in r.json()["classifications"]:
 			result_map[class_found['class_name']] = class_found['confidence']
@@ -30,104 +169,345 @@ def classify_text(nlu_url, nlu_apikey, classify_model, text):
 	except Exception as ex:
 		print("*** " + env + " ERROR GETTING NLC SCORE:", str(ex))
 		raise
-	
 
-def translate_text(url, translate_apikey, language, text):
 
-	if "en" in language or "unk" in language:
-		return text
-		
-	language_mapping = {
-		"ger": "DE",
-	}
-	
+# @DEV: Classifies a batch of (classify_model, text) pairs. Identical pairs are only sent once, pairs found in cache are not sent
+# at all, and the rest share a pooled session with at most max_workers in flight. New results are added to cache.
+# @RET: Returns a dict mapping each distinct (classify_model, text) pair to its classify_text result
+def classify_texts(nlu_url, nlu_apikey, pairs, max_workers=NLU_MAX_WORKERS, cache=None):
+	class_maps = {}
+	unique_pairs = []
+	for pair in dict.fromkeys(pairs):
+		cached = cache.get(*pair) if cache is not None else None
+		if cached is not None:
+			class_maps[pair] = cached
+		else:
+			unique_pairs.append(pair)
+	if not unique_pairs:
+		return class_maps
+	workers = min(max_workers, len(unique_pairs))
+	with requests.Session() as session:
+		session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+		session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			results = executor.map(lambda pair: classify_text(nlu_url, nlu_apikey, pair[0], pair[1], session=session), unique_pairs)
+			for pair, result_map in zip(unique_pairs, results):
+				class_maps[pair] = result_map
+				if cache is not None:
+					cache.put(pair[0], pair[1], result_map)
+	return class_maps
+
+
+def translate_text(url, translate_apikey, language, text, cache=None):
+	return translate_texts(url, translate_apikey, language, [text], cache=cache)[0]
+
+
+# @DEV: Sends batch to the translation service in one POST request (a GET query string of 50 titles can outgrow URL limits). If the
+# request fails, or returns a different number of translations, each text is sent again on its own, so only the texts that fail
+# by themselves are lost.
+# @RET: Returns the translations in the same order as batch. A text whose request failed translates to "".
+def translate_batch(url, translate_apikey, source_lang, batch):
+
 	data = {
 		"auth_key": translate_apikey,
-		"text": text,
-		"source_lang": language_mapping[language],
+		"text": batch,
+		"source_lang": source_lang,
 		"target_lang": "EN-US"
 	}
 	
 	try:
-		r = requests.get(url, params=data)
+		r = requests.post(url, data=data, timeout=TRANSLATE_TIMEOUT)
 		
 		r.raise_for_status()
-		return r.json()["translations"][0]["text"]
+		results = [translation["text"] for translation in r.json()["translations"]]
+		if len(results) != len(batch):
+			raise ValueError("got %d translations for %d texts" % (len(results), len(batch)))
+		return results
 	except Exception as e:
 		print("*** " + env + " ERROR TRANSLATING TEXT", e)
-		return ""
+		if len(batch) == 1:
+			return [""]
+	return [translate_batch(url, translate_apikey, source_lang, [text])[0] for text in batch]
+
+
+# @DEV: Translates a list of texts to English, sending up to TRANSLATE_BATCH_SIZE texts per request. Texts found in cache are not
+# sent, and successful translations are added to it.
+# @RET: Returns the translations in the same order as texts. A text that could not be translated translates to "".
+def translate_texts(url, translate_apikey, language, texts, cache=None):
+
+	if "en" in language or "unk" in language or not texts:
+		return list(texts)
+		
+	source_lang = TRANSLATE_LANGUAGE_MAPPING[language]
+	translations = {}
+	missing = []
+	for text in dict.fromkeys(texts):
+		cached = cache.get(source_lang, text) if cache is not None else None
+		if cached is not None:
+			translations[text] = cached
+		else:
+			missing.append(text)
+	
+	for i in range(0, len(missing), TRANSLATE_BATCH_SIZE):
+		batch = missing[i:i + TRANSLATE_BATCH_SIZE]
+		for text, translated in zip(batch, translate_batch(url, translate_apikey, source_lang, batch)):
+			translations[text] = translated
+			if translated and cache is not None:
+				cache.put(source_lang, text, translated)
+	return [translations[text] for text in texts]
+
 
+# Module level, so it outlives a run while the action stays warm; its hit counts are totals since the action started.
+date_parse_cache = parser.parsecache(maxsize = DATE_PARSE_CACHE_SIZE)
 
-# @DEV: Takes a date string and converts it to central time stamp in miliseconds
+
+# @DEV: Takes a date string and converts it to a UTC time stamp in miliseconds, applying the date's UTC offset. Dates without one are taken as UTC.
 # @PARAM: _date is a string in the form of: "Mon, 20 May 2019 18:00:56 +0000"
 def get_UTC_time(_date):
-	utc_in_miliseconds = calendar.timegm(parser.parse(_date).timetuple()) * 1000
+	# Whole seconds, as the UTC shortcut in RunContext.published_time (calendar.timegm of feedparser's time tuple) has no fractions
+	utc_in_miliseconds = epoch_millis([_date], parse = date_parse_cache)[0] // 1000 * 1000
 	return utc_in_miliseconds
 
 
+# Date strings whose offset is UTC. feedparser's own parse (normalized to UTC) is only sure to agree with get_UTC_time for these: it also
+# knows zone names such as EST, which dateutil leaves naive and get_UTC_time takes as UTC.
+UTC_DATE_SUFFIX_RE = re.compile(r'(?:[+-]00:?00|\bGMT|\bUTC|\bUT|\dZ)\s*$', re.IGNORECASE)
+
+
+# @DEV: Time window shared by every entry of a run, fixed once at the start, plus a memo of date strings already converted by get_UTC_time.
+class RunContext:
+
+	def __init__(self):
+		now = datetime.now()
+		self.today_utc_milli = int(now.replace(tzinfo = timezone.utc).timestamp() * 1000)
+		self.yesterday_utc_milli = int((now - timedelta(days = 1)).replace(tzinfo = timezone.utc).timestamp() * 1000)
+		self.tomorrow_utc_milli = int((now + timedelta(days = 1)).replace(tzinfo = timezone.utc).timestamp() * 1000)
+		# Entries dated before this cannot pass the publish date checks, so newest_first feeds are only parsed up to the first of them
+		self.parse_since = datetime.fromtimestamp(self.yesterday_utc_milli / 1000, timezone.utc) - PARSE_SINCE_SLACK
+		# date string -> get_UTC_time(date string)
+		self.utc_times = {}
+
+	# @RET: Returns get_UTC_time(_date), parsing each distinct string only once per run
+	def utc_time(self, _date):
+		utc_in_miliseconds = self.utc_times.get(_date)
+		if utc_in_miliseconds is None:
+			utc_in_miliseconds = self.utc_times[_date] = get_UTC_time(_date)
+		return utc_in_miliseconds
+
+	# @RET: Returns get_UTC_time(item.published), or None if the entry has no publish date. For UTC dates the published_parsed
+	# tuple feedparser already produced is used, which skips dateutil.
+	def published_time(self, item):
+		if not hasattr(item, 'published'):
+			return None
+		published = item.published
+		utc_in_miliseconds = self.utc_times.get(published)
+		if utc_in_miliseconds is None:
+			published_parsed = item.get('published_parsed')
+			if published_parsed and UTC_DATE_SUFFIX_RE.search(published):
+				utc_in_miliseconds = self.utc_times[published] = calendar.timegm(published_parsed) * 1000
+			else:
+				utc_in_miliseconds = self.utc_time(published)
+		return utc_in_miliseconds
+
+
+# @DEV: Loads the per-feed conditional GET validators saved by the previous run.
+# @RET: Returns a dict mapping feed_url to {"etag": ..., "modified": ...}; empty if there is no usable store
+def load_feed_validators(path):
+	if not path or not os.path.exists(path):
+		return {}
+	try:
+		with open(path) as f:
+			return json.load(f)
+	except Exception as ex:
+		print("*** " + env + " ERROR LOADING FEED VALIDATORS:", str(ex))
+		return {}
+
+
+# @DEV: Saves the per-feed conditional GET validators for the next run. The file is replaced atomically so a crashed run cannot leave it half written.
+def save_feed_validators(path, validators):
+	if not path:
+		return
+	tmp_path = path + ".tmp"
+	try:
+		with open(tmp_path, "w") as f:
+			json.dump(validators, f)
+		os.replace(tmp_path, path)
+	except Exception as ex:
+		print("*** " + env + " ERROR SAVING FEED VALIDATORS:", str(ex))
+
+
+# @DEV: Downloads a single feed, holding the per-host semaphore for the duration of the request.
+# @PARAM: validators is the feed's stored {"etag": ..., "modified": ...}, sent as If-None-Match / If-Modified-Since.
+# @PARAM: session is the requests.Session whose keep-alive connections are reused, or None for a one-off request.
+# @RET: Returns a (status, content, headers) tuple, or None if the feed could not be fetched. content is None on a 304.
+def fetch_feed(feed_url, host_limits, validators=None, session=None):
+	host = urllib.parse.urlsplit(feed_url).netloc
+	headers = {"User-Agent": feedparser.USER_AGENT, "Accept": feedparser.ACCEPT_HEADER}
+	if validators:
+		if validators.get("etag"):
+			headers["If-None-Match"] = validators["etag"]
+		if validators.get("modified"):
+			headers["If-Modified-Since"] = validators["modified"]
+	try:
+		with host_limits[host]:
+			r = (session or requests).get(feed_url, headers=headers, timeout=FETCH_TIMEOUT)
+		r.raise_for_status()
+	except Exception as ex:
+		print("*** " + env + " ERROR FETCHING FEED:", feed_url, str(ex))
+		return None
+	# requests has already undone any content-encoding, so only pass along what feedparser uses to interpret the body
+	response_headers = {k: v for k, v in r.headers.items() if k.lower() in FETCH_PASSTHROUGH_HEADERS}
+	response_headers["content-location"] = r.url
+	if r.status_code == 304:
+		return r.status_code, None, response_headers
+	return r.status_code, r.content, response_headers
+
+
+# @DEV: Downloads every feed in _feed_list in parallel, with at most per_host_limit requests in flight against any one host, and yields
+# each feed in list order as soon as its own download is done, while the rest keep downloading. Downloads share one session that keeps
+# up to per_host_limit connections open to each host, so feeds from the same publisher reuse connections and TLS sessions.
+# @PARAM: _feed_list is a list of feeds to fetch.
+# @PARAM: feed_validators maps feed_url to the validators saved by load_feed_validators.
+# @RET: Yields (feed, result of fetch_feed) for every feed in _feed_list
+def iter_fetched_feeds(_feed_list, max_workers=FETCH_MAX_WORKERS, per_host_limit=FETCH_PER_HOST_LIMIT, feed_validators={}):
+	feed_urls = list(dict.fromkeys(feed['feed_url'] for feed in _feed_list))
+	host_limits = {}
+	for feed_url in feed_urls:
+		host = urllib.parse.urlsplit(feed_url).netloc
+		if host not in host_limits:
+			host_limits[host] = threading.BoundedSemaphore(per_host_limit)
+	if not feed_urls:
+		return
+	with requests.Session() as session:
+		session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=len(host_limits), pool_maxsize=per_host_limit))
+		session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=len(host_limits), pool_maxsize=per_host_limit))
+		with ThreadPoolExecutor(max_workers=min(max_workers, len(feed_urls))) as executor:
+			futures = {feed_url: executor.submit(fetch_feed, feed_url, host_limits, feed_validators.get(feed_url), session) for feed_url in feed_urls}
+			for feed in _feed_list:
+				yield feed, futures[feed['feed_url']].result()
+
+
+# @DEV: Downloads every feed in _feed_list in parallel, see iter_fetched_feeds.
+# @RET: Returns a dict mapping each feed_url to the result of fetch_feed
+def fetch_feeds(_feed_list, max_workers=FETCH_MAX_WORKERS, per_host_limit=FETCH_PER_HOST_LIMIT, feed_validators={}):
+	return {feed['feed_url']: fetched for feed, fetched in iter_fetched_feeds(_feed_list, max_workers, per_host_limit, feed_validators)}
+
+
+# @DEV: Runs feedparser over a feed downloaded by fetch_feeds. Feeds that failed to download parse as empty, like feedparser.parse does for a bad URL,
+# and a 304 is returned without parsing anything, with the same status and validators feedparser.parse reports.
+# Entries come back as slotted feedparser.FeedParserEntry records rather than FeedParserDicts.
+# @PARAM: since, if given, ends the parse at the first entry published before it (see feedparser.parse)
+def parse_fetched_feed(fetched, since=None):
+	if fetched is None:
+		return feedparser.FeedParserDict(feed=feedparser.FeedParserDict(), entries=[], bozo=1)
+	status, content, response_headers = fetched
+	if status == 304:
+		result = feedparser.FeedParserDict(feed=feedparser.FeedParserDict(), entries=[], bozo=0, status=304)
+		http_headers = dict((k.lower(), v) for k, v in response_headers.items())
+		if http_headers.get("etag"):
+			result["etag"] = http_headers["etag"]
+		if http_headers.get("last-modified"):
+			result["modified"] = http_headers["last-modified"]
+		return result
+	result = feedparser.parse(content, response_headers=response_headers, fields=PARSE_FIELDS, compact=True, since=since)
+	result["status"] = status
+	return result
+
+
 # @DEV: Uses the feedparser library to extract all article URLs from an XML feed and return as a list.
-# @PARAM: _feed_list is a list of feeds to parse.
-def parse_feed(_nlu_url,_nlu_api_key,_classify_id,_financial_classify_id, _todays_date_pretty, _todays_date_struct, _already_ingested, _use_sql, translate_url, translate_apikey, _feed_list=[]):
+# Collects the records produced by iter_articles into article_map; see iter_articles for the parameters.
+def parse_feed(_nlu_url,_nlu_api_key,_classify_id,_financial_classify_id, _todays_date_pretty, _todays_date_struct, _already_ingested, _use_sql, translate_url, translate_apikey, _feed_list=[], fetch_workers=FETCH_MAX_WORKERS, validator_store_path=VALIDATOR_STORE_PATH, classification_cache_path=CLASSIFICATION_CACHE_PATH, translation_cache_path=TRANSLATION_CACHE_PATH):
 	article_map = {}
-	today = datetime.now()
-	today_utc = today.replace(tzinfo = timezone.utc)
-	today_utc_milli = int(today_utc.timestamp() * 1000)
+	for file_name, article in iter_articles(_nlu_url, _nlu_api_key, _classify_id, _financial_classify_id, _todays_date_pretty, _todays_date_struct, _already_ingested, _use_sql, translate_url, translate_apikey, _feed_list, fetch_workers, validator_store_path, classification_cache_path, translation_cache_path):
+		article_map[file_name] = article
+	return {"article_map" : article_map }
+
+
+# @DEV: Streaming version of parse_feed. Feeds are processed in list order as their downloads finish, and each feed's articles are
+# yielded as soon as that feed has been translated and classified, so they can be ingested while later feeds are still in flight.
+# A file_name can be yielded more than once; like article_map, the last record for a file_name wins.
+# Validators and caches are only saved once the generator has been run to the end.
+# @PARAM: _already_ingested is an IngestedTitleIndex, or the raw feed_name -> articles dict from get_ingested_articles.
+# @PARAM: _feed_list is a list of feeds to parse.
+# @PARAM: fetch_workers is the number of feeds downloaded concurrently.
+# @PARAM: validator_store_path is the file ETag / Last-Modified validators are kept in between runs; unchanged feeds are skipped. None disables it.
+# @PARAM: classification_cache_path is the file classification results are kept in between runs. None keeps them for this run only.
+# @PARAM: translation_cache_path is the file translated titles are kept in between runs. None keeps them for this run only.
+# @RET: Yields (file_name, {"metadata": {...}}) for every kept article
+def iter_articles(_nlu_url,_nlu_api_key,_classify_id,_financial_classify_id, _todays_date_pretty, _todays_date_struct, _already_ingested, _use_sql, translate_url, translate_apikey, _feed_list=[], fetch_workers=FETCH_MAX_WORKERS, validator_store_path=VALIDATOR_STORE_PATH, classification_cache_path=CLASSIFICATION_CACHE_PATH, translation_cache_path=TRANSLATION_CACHE_PATH):
+	if not isinstance(_already_ingested, IngestedTitleIndex):
+		_already_ingested = IngestedTitleIndex(_already_ingested)
+	run_context = RunContext()
 
-	for feed in _feed_list:
-		data = feedparser.parse(feed['feed_url'])
+	translation_cache = TranslationCache(translation_cache_path)
+	# Shared by every feed, so a headline syndicated across feeds is only classified once per run
+	classification_cache = ClassificationCache(classification_cache_path)
+	feed_validators = load_feed_validators(validator_store_path)
+
+	for feed, fetched in iter_fetched_feeds(_feed_list, max_workers=fetch_workers, feed_validators=feed_validators):
+		data = parse_fetched_feed(fetched, since=run_context.parse_since if feed.get('newest_first') else None)
+		if data.get('status') == 304:
+			print("*** " + env + " SKIPPING UNCHANGED FEED: ", feed['feed_url'])
+			continue
+		# Feeds whose ingested articles could not be looked up fall back to the time-based checks
+		use_sql = _use_sql and _already_ingested.has_feed(feed['feed_name'])
+
+		language = "unk"
+		if hasattr(data["feed"], "language") and data["feed"]["language"] != "":
+			language = data["feed"]["language"]
+
+		# Entries that pass the publish date checks, translated together once the whole feed has been checked
+		candidates = []
 		for item in data.entries:
-			yesterday = datetime.now() - timedelta(days = 1)
-			yesterday_utc = yesterday.replace(tzinfo = timezone.utc)
-			yesterday_utc_milli = int(yesterday_utc.timestamp() * 1000)
-			tomorrow = datetime.now() + timedelta(days = 1)
-			tomorrow_utc = tomorrow.replace(tzinfo = timezone.utc)
-			tomorrow_utc_milli = int(tomorrow_utc.timestamp() * 1000)
-			language = "unk"
 			article_title = ""
 			
-			if hasattr(data["feed"], "language") and data["feed"]["language"] != "":
-				language = data["feed"]["language"]
-			
 			if hasattr(item, 'title'):
 				article_title = item.title		
 			else:
 				continue
+
+			# None when the entry has no publish date
+			published_utc_milli = run_context.published_time(item)
 				
-			if _use_sql:
+			if use_sql:
 				# Ensure Publish date is within 24 hours (past or future) of now, otherwise skip
-				if (hasattr(item, 'published') and (get_UTC_time(item.published) > yesterday_utc_milli and get_UTC_time(item.published) < tomorrow_utc_milli)) or not hasattr(item, 'published'):
-					# Translate title
-					article_title = translate_text(translate_url, translate_apikey, language, article_title)
-					if article_title == "":
-						continue
-					
-					# Skip already ingested articles
-					skip = False
-					print("*** " + env + " CHECKING FEED AGAINST ALREADY INGESTED: ", feed['feed_name'], " NUMBER:", len(_already_ingested[feed['feed_name']]))
-					for ingested_article in _already_ingested[feed['feed_name']]:
-						if strip_characters(article_title.lower()) == strip_characters(ingested_article['article_title'].lower()):
-							#print("*** " + env + " SKIPPING ITEM VS DB: ", item.title, " VS ", ingested_article['article_title'])
-							skip = True
-							break
-					if skip:
-						print("*** " + env + " SKIPPING ARTICLE USING DB: ", article_title, " FEED:", feed['feed_url'])
-						continue
-				else:
+				if published_utc_milli is not None and not (run_context.yesterday_utc_milli < published_utc_milli < run_context.tomorrow_utc_milli):
 					print("*** " + env + " SKIPPING ARTICLE DUE TO BAD PUBLISH DATE: ", article_title, " FEED:", feed['feed_url'])
 					continue
 			else:
 				print("*** " + env + " NOT USING DB")
 				# Ensure Publish date is within 24 hours (past or future) of now, otherwise skip
-				if (hasattr(item, 'published') and (get_UTC_time(item.published) < yesterday_utc_milli or get_UTC_time(item.published) > tomorrow_utc_milli)) or not hasattr(item, 'published'):
+				if published_utc_milli is None or published_utc_milli < run_context.yesterday_utc_milli or published_utc_milli > run_context.tomorrow_utc_milli:
 					print("*** " + env + " SKIPPING ARTICLE DUE TO BAD PUBLISH DATE: ", article_title, "FEED:", feed['feed_url'])
 					continue
-				if (hasattr(item, 'published') and (get_UTC_time(feed['last_updated_date']) > get_UTC_time(item.published))) or not hasattr(item, 'published'):
+				if run_context.utc_time(feed['last_updated_date']) > published_utc_milli:
 					print("*** " + env + " SKIPPING ARTICLE USING TIME: ", article_title, "FEED:", feed['feed_url'])
 					continue
+			candidates.append((item, article_title, published_utc_milli))
+
+		# (file_name, record, classify_model, title) for every kept article, classified in one batch once the feed is read
+		pending_classifications = []
+
+		# Translate titles
+		translated_titles = translate_texts(translate_url, translate_apikey, language, [article_title for _, article_title, _ in candidates], cache=translation_cache)
+
+		# The validators are only kept if every candidate was translated; otherwise the feed is downloaded again next run, so the articles
+		# dropped for a failed translation are retried rather than hidden behind a 304. A failed classification raises, which ends the
+		# run before any validators are saved.
+		if any(translated_title == "" and article_title != "" for (_, article_title, _), translated_title in zip(candidates, translated_titles)):
+			feed_validators.pop(feed['feed_url'], None)
+		elif data.get('etag') or data.get('modified'):
+			feed_validators[feed['feed_url']] = {"etag": data.get('etag'), "modified": data.get('modified')}
+
+		for (item, _, published_utc_milli), article_title in zip(candidates, translated_titles):
+			if article_title == "":
+				continue
 				
-				# Translate Title
-				article_title = translate_text(translate_url, translate_apikey, language, article_title)
-				if article_title == "":
+			if use_sql:
+				# Skip already ingested articles
+				print("*** " + env + " CHECKING FEED AGAINST ALREADY INGESTED: ", feed['feed_name'], " NUMBER:", _already_ingested.size(feed['feed_name']))
+				if _already_ingested.has_title(feed['feed_name'], article_title):
+					print("*** " + env + " SKIPPING ARTICLE USING DB: ", article_title, " FEED:", feed['feed_url'])
 					continue
 				
 			#find a file name
@@ -140,20 +520,20 @@ def parse_feed(_nlu_url,_nlu_api_key,_classify_id,_financial_classify_id, _today
 
 			if filter_by_title(file_name, True):
 				
-				class_map = {}
 				if "Dow Jones" in feed['publisher']:
-					class_map = classify_text(_nlu_url, _nlu_api_key, _financial_classify_id, article_title)
+					classify_model = _financial_classify_id
 				else:
-					class_map = classify_text(_nlu_url, _nlu_api_key, _classify_id, article_title)
+					classify_model = _classify_id
 					
-				negative_classifier = class_map['NEGATIVE']
-				lead_classifier = class_map['LEAD']
+				# Filled in from the batch classification below
+				negative_classifier = None
+				lead_classifier = None
 
-				if not hasattr(item, 'published') or (hasattr(item, 'published') and get_UTC_time(item.published) > today_utc_milli):
-					article_map[file_name] = {
+				if published_utc_milli is None or published_utc_milli > run_context.today_utc_milli:
+					article = {
 						"metadata": {
 							"url":item.link,
-							"pub_date": today_utc_milli,
+							"pub_date": run_context.today_utc_milli,
 							"language": language,
 							"title":article_title, 
 							"publisher":feed['publisher'], 
@@ -163,10 +543,10 @@ def parse_feed(_nlu_url,_nlu_api_key,_classify_id,_financial_classify_id, _today
 						}
 					}      
 				else:
-					article_map[file_name] = {
+					article = {
 						"metadata": {
 							"url":item.link,  
-							"pub_date": get_UTC_time(item.published),
+							"pub_date": published_utc_milli,
 							"language": language,
 							"title":article_title, 
 							"publisher":feed['publisher'], 
@@ -175,46 +555,106 @@ def parse_feed(_nlu_url,_nlu_api_key,_classify_id,_financial_classify_id, _today
 							"lead_classifier": lead_classifier
 						}
 					}      
+				pending_classifications.append((file_name, article, classify_model, article_title))
+
+		class_maps = classify_texts(_nlu_url, _nlu_api_key, [(classify_model, article_title) for _, _, classify_model, article_title in pending_classifications], cache=classification_cache)
+		for file_name, article, classify_model, article_title in pending_classifications:
+			class_map = class_maps[(classify_model, article_title)]
+			article["metadata"]["negative_classifier"] = class_map['NEGATIVE']
+			article["metadata"]["lead_classifier"] = class_map['LEAD']
+			yield file_name, article
 				
-	return {"article_map" : article_map }
+	print("*** " + env + " CLASSIFICATION CACHE HITS:", classification_cache.hits, " MISSES:", classification_cache.misses)
+	classification_cache.save()
+	print("*** " + env + " TRANSLATION CACHE HITS:", translation_cache.hits, " MISSES:", translation_cache.misses)
+	translation_cache.save()
+	date_parse_info = date_parse_cache.cache_info()
+	print("*** " + env + " DATE PARSE CACHE HITS:", date_parse_info.hits, " MISSES:", date_parse_info.misses, " SIZE:", date_parse_info.currsize)
+	save_feed_validators(validator_store_path, feed_validators)
+
+# Title patterns that always filter an article out, combined into one alternation so a title is scanned once
+TITLE_FILTER_PATTERNS = [r"\bshop",r"\bsale",r"\bphoto",r"\bprice","weed","marijuana","cannabis"]
+TITLE_FILTER_RE = re.compile("|".join(TITLE_FILTER_PATTERNS))
+
+# Words that filter an article out when they appear as a whole '-' separated part of its title
+SWEAR_LIST = frozenset(["4r5e","5h1t","5hit","a55","anal","anus","ar5e","arrse","arse","ass","ass-fucker","asses","assfucker","assfukka","asshole","assholes","asswhole","a_s_s","b!tch","b00bs","b17ch","b1tch","ballbag","balls","ballsack","bastard","beastial","beastiality","bellend","bestial","bestiality","bi+ch","biatch","bitch","bitcher","bitchers","bitches","bitchin","bitching","bloody","blow job","blowjob","blowjobs","boiolas","bollock","bollok","boner","boob","boobs","booobs","boooobs","booooobs","booooooobs","breasts","buceta","bugger","bum","bunny fucker","butt","butthole","buttmuch","buttplug","c0ck","c0cksucker","carpet muncher","cawk","chink","cipa","cl1t","clit","clitoris","clits","cnut","cock","cock-sucker","cockface","cockhead","cockmunch","cockmuncher","cocks","cocksuck ","cocksucked ","cocksucker","cocksucking","cocksucks ","cocksuka","cocksukka","cok","cokmuncher","coksucka","coon","cox","crap","cum","cummer","cumming","cums","cumshot","cunilingus","cunillingus","cunnilingus","cunt","cuntlick ","cuntlicker ","cuntlicking ","cunts","cyalis","cyberfuc","cyberfuck ","cyberfucked ","cyberfucker","cyberfuckers","cyberfucking ","d1ck","damn","dick","dickhead","dildo","dildos","dink","dinks","dirsa","dlck","dog-fucker","doggin","dogging","donkeyribber","doosh","duche","dyke","ejaculate","ejaculated","ejaculates ","ejaculating ","ejaculatings","ejaculation","ejakulate","f u c k","f u c k e r","f4nny","fag","fagging","faggitt","faggot","faggs","fagot","fagots","fags","fanny","fannyflaps","fannyfucker","fanyy","fatass","fcuk","fcuker","fcuking","feck","fecker","felching","fellate","fellatio","fingerfuck ","fingerfucked ","fingerfucker ","fingerfuckers","fingerfucking ","fingerfucks ","fistfuck","fistfucked ","fistfucker ","fistfuckers ","fistfucking ","fistfuckings ","fistfucks ","flange","fook","fooker","fuck","fucka","fucked","fucker","fuckers","fuckhead","fuckheads","fuckin","fucking","fuckings","fuckingshitmotherfucker","fuckme ","fucks","fuckwhit","fuckwit","fudge packer","fudgepacker","fuk","fuker","fukker","fukkin","fuks","fukwhit","fukwit","fux","fux0r","f_u_c_k","gangbang","gangbanged ","gangbangs ","gaylord","gaysex","goatse","God","god-dam","god-damned","goddamn","goddamned","hardcoresex ","hell","heshe","hoar","hoare","hoer","homo","hore","horniest","horny","hotsex","jack-off ","jackoff","jap","jerk-off ","jism","jiz ","jizm ","jizz","kawk","knob","knobead","knobed","knobend","knobhead","knobjocky","knobjokey","kock","kondum","kondums","kum","kummer","kumming","kums","kunilingus","l3i+ch","l3itch","labia","lmfao","lust","lusting","m0f0","m0fo","m45terbate","ma5terb8","ma5terbate","masochist","master-bate","masterb8","masterbat*","masterbat3","masterbate","masterbation","masterbations","masturbate","mo-fo","mof0","mofo","mothafuck","mothafucka","mothafuckas","mothafuckaz","mothafucked ","mothafucker","mothafuckers","mothafuckin","mothafucking ","mothafuckings","mothafucks","mother fucker","motherfuck","motherfucked","motherfucker","motherfuckers","motherfuckin","motherfucking","motherfuckings","motherfuckka","motherfucks","muff","mutha","muthafecker","muthafuckker","muther","mutherfucker","n1gga","n1gger","nazi","nigg3r","nigg4h","nigga","niggah","niggas","niggaz","nigger","niggers ","nob","nob jokey","nobhead","nobjocky","nobjokey","numbnuts","nutsack","orgasim ","orgasims ","orgasm","orgasms ","p0rn","pawn","pecker","penis","penisfucker","phonesex","phuck","phuk","phuked","phuking","phukked","phukking","phuks","phuq","pigfucker","pimpis","piss","pissed","pisser","pissers","pisses ","pissflaps","pissin ","pissing","pissoff ","poop","porn","porno","pornography","pornos","prick","pricks","pron","pube","pusse","pussi","pussies","pussy","pussys ","rectum","retard","rimjaw","rimming","s hit","s.o.b.","sadist","schlong","screwing","scroat","scrote","scrotum","semen","sex","sh!+","sh!t","sh1t","shag","shagger","shaggin","shagging","shemale","shi+","shit","shitdick","shite","shited","shitey","shitfuck","shitfull","shithead","shiting","shitings","shits","shitted","shitter","shitters ","shitting","shittings","shitty ","skank","slut","sluts","smegma","smut","snatch","son-of-a-bitch","spac","spunk","s_h_i_t","t1tt1e5","t1tties","teets","teez","testical","testicle","tit","titfuck","tits","titt","tittie5","tittiefucker","titties","tittyfuck","tittywank","titwank","tosser","turd","tw4t","twat","twathead","twatty","twunt","twunter","v14gra","v1gra","vagina","viagra","vulva","w00se","wang","wank","wanker","wanky","whoar","whore","willies","willy","xrated","xxx"])
 
 # @DEV: Filter the articles by their title. It should be passed a title and a Boolean to use a swear word filter or not. 
 # It will return True or False (False if it should be filtered out, True if not).
 def filter_by_title(title, swear_flag):
-	filtered_regexes = [r"\bshop",r"\bsale",r"\bphoto",r"\bprice","weed","marijuana","cannabis"]
-	for r in filtered_regexes:
-		if re.search(r,title):
-			return False
+	if TITLE_FILTER_RE.search(title):
+		return False
 
 	if swear_flag:
-		SWEAR_LIST = ["4r5e","5h1t","5hit","a55","anal","anus","ar5e","arrse","arse","ass","ass-fucker","asses","assfucker","assfukka","asshole","assholes","asswhole","a_s_s","b!tch","b00bs","b17ch","b1tch","ballbag","balls","ballsack","bastard","beastial","beastiality","bellend","bestial","bestiality","bi+ch","biatch","bitch","bitcher","bitchers","bitches","bitchin","bitching","bloody","blow job","blowjob","blowjobs","boiolas","bollock","bollok","boner","boob","boobs","booobs","boooobs","booooobs","booooooobs","breasts","buceta","bugger","bum","bunny fucker","butt","butthole","buttmuch","buttplug","c0ck","c0cksucker","carpet muncher","cawk","chink","cipa","cl1t","clit","clitoris","clits","cnut","cock","cock-sucker","cockface","cockhead","cockmunch","cockmuncher","cocks","cocksuck ","cocksucked ","cocksucker","cocksucking","cocksucks ","cocksuka","cocksukka","cok","cokmuncher","coksucka","coon","cox","crap","cum","cummer","cumming","cums","cumshot","cunilingus","cunillingus","cunnilingus","cunt","cuntlick ","cuntlicker ","cuntlicking ","cunts","cyalis","cyberfuc","cyberfuck ","cyberfucked ","cyberfucker","cyberfuckers","cyberfucking ","d1ck","damn","dick","dickhead","dildo","dildos","dink","dinks","dirsa","dlck","dog-fucker","doggin","dogging","donkeyribber","doosh","duche","dyke","ejaculate","ejaculated","ejaculates ","ejaculating ","ejaculatings","ejaculation","ejakulate","f u c k","f u c k e r","f4nny","fag","fagging","faggitt","faggot","faggs","fagot","fagots","fags","fanny","fannyflaps","fannyfucker","fanyy","fatass","fcuk","fcuker","fcuking","feck","fecker","felching","fellate","fellatio","fingerfuck ","fingerfucked ","fingerfucker ","fingerfuckers","fingerfucking ","fingerfucks ","fistfuck","fistfucked ","fistfucker ","fistfuckers ","fistfucking ","fistfuckings ","fistfucks ","flange","fook","fooker","fuck","fucka","fucked","fucker","fuckers","fuckhead","fuckheads","fuckin","fucking","fuckings","fuckingshitmotherfucker","fuckme ","fucks","fuckwhit","fuckwit","fudge packer","fudgepacker","fuk","fuker","fukker","fukkin","fuks","fukwhit","fukwit","fux","fux0r","f_u_c_k","gangbang","gangbanged ","gangbangs ","gaylord","gaysex","goatse","God","god-dam","god-damned","goddamn","goddamned","hardcoresex ","hell","heshe","hoar","hoare","hoer","homo","hore","horniest","horny","hotsex","jack-off ","jackoff","jap","jerk-off ","jism","jiz ","jizm ","jizz","kawk","knob","knobead","knobed","knobend","knobhead","knobjocky","knobjokey","kock","kondum","kondums","kum","kummer","kumming","kums","kunilingus","l3i+ch","l3itch","labia","lmfao","lust","lusting","m0f0","m0fo","m45terbate","ma5terb8","ma5terbate","masochist","master-bate","masterb8","masterbat*","masterbat3","masterbate","masterbation","masterbations","masturbate","mo-fo","mof0","mofo","mothafuck","mothafucka","mothafuckas","mothafuckaz","mothafucked ","mothafucker","mothafuckers","mothafuckin","mothafucking ","mothafuckings","mothafucks","mother fucker","motherfuck","motherfucked","motherfucker","motherfuckers","motherfuckin","motherfucking","motherfuckings","motherfuckka","motherfucks","muff","mutha","muthafecker","muthafuckker","muther","mutherfucker","n1gga","n1gger","nazi","nigg3r","nigg4h","nigga","niggah","niggas","niggaz","nigger","niggers ","nob","nob jokey","nobhead","nobjocky","nobjokey","numbnuts","nutsack","orgasim ","orgasims ","orgasm","orgasms ","p0rn","pawn","pecker","penis","penisfucker","phonesex","phuck","phuk","phuked","phuking","phukked","phukking","phuks","phuq","pigfucker","pimpis","piss","pissed","pisser","pissers","pisses ","pissflaps","pissin ","pissing","pissoff ","poop","porn","porno","pornography","pornos","prick","pricks","pron","pube","pusse","pussi","pussies","pussy","pussys ","rectum","retard","rimjaw","rimming","s hit","s.o.b.","sadist","schlong","screwing","scroat","scrote","scrotum","semen","sex","sh!+","sh!t","sh1t","shag","shagger","shaggin","shagging","shemale","shi+","shit","shitdick","shite","shited","shitey","shitfuck","shitfull","shithead","shiting","shitings","shits","shitted","shitter","shitters ","shitting","shittings","shitty ","skank","slut","sluts","smegma","smut","snatch","son-of-a-bitch","spac","spunk","s_h_i_t","t1tt1e5","t1tties","teets","teez","testical","testicle","tit","titfuck","tits","titt","tittie5","tittiefucker","titties","tittyfuck","tittywank","titwank","tosser","turd","tw4t","twat","twathead","twatty","twunt","twunter","v14gra","v1gra","vagina","viagra","vulva","w00se","wang","wank","wanker","wanky","whoar","whore","willies","willy","xrated","xxx"]
-		if any([element in title.split('-') for element in SWEAR_LIST]):
+		if not SWEAR_LIST.isdisjoint(title.split('-')):
 			return False
 				
 	return True
 
 
-# @DEV: Connect to SQL DB to get articles ingested in last 24 hours
-# @RET: Returns True if SQL query was successful, and returns object containing all articles ingested
-def get_ingested_articles(feed_list, url, apikey):
+# @DEV: Connect to SQL DB to get articles ingested in last 24 hours. Feeds are looked up concurrently over one pooled session, retrying
+# server errors, and a feed whose lookup still fails is left out of the result so only that feed falls back to time-based filtering.
+# @RET: Returns True if any SQL query was successful, and returns object containing all articles ingested for the feeds that succeeded
+def get_ingested_articles(feed_list, url, apikey, max_workers=SQL_DB_MAX_WORKERS):
 	yesterday = datetime.now() - timedelta(days = 1)
 	yesterday_utc = yesterday.replace(tzinfo = timezone.utc)
 	yesterday_utc_milli = int(yesterday_utc.timestamp() * 1000)
 	past_day = datetime.now() - timedelta(days = 7)
 	past_day_utc = past_day.replace(tzinfo = timezone.utc)
 	past_day_utc_formatted = past_day_utc.strftime("%Y-%m-%d")
-	ingested_articles = {}
-	for feed in feed_list:
-		params = {"apikey": apikey, "ingestdate": past_day_utc_formatted, "magazine": feed['feed_name']}
+	feed_names = list(dict.fromkeys(feed['feed_name'] for feed in feed_list))
+	if not feed_names:
+		return True, {}
+
+	def get_feed_articles(feed_name):
+		params = {"apikey": apikey, "ingestdate": past_day_utc_formatted, "magazine": feed_name}
 		try:
-			r = requests.get(url + 'v1/get-article-by-ingestdate-magazine', params=params)
+			r = session.get(url + 'v1/get-article-by-ingestdate-magazine', params=params, timeout=SQL_DB_TIMEOUT)
 			r.raise_for_status()
-			ingested_articles[feed['feed_name']] = r.json()
+			return r.json()
 		except Exception as ex:
-			print("*** " + env + " ERROR USING SQL DB ***")
-			return False, {}
+			# The request URL carries the apikey, so the exception itself is not logged
+			print("*** " + env + " ERROR USING SQL DB FOR FEED:", feed_name, type(ex).__name__)
+			return None
+
+	workers = min(max_workers, len(feed_names))
+	retries = requests.adapters.Retry(total=SQL_DB_RETRIES, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+	with requests.Session() as session:
+		session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retries))
+		session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retries))
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			results = list(executor.map(get_feed_articles, feed_names))
+
+	ingested_articles = {feed_name: articles for feed_name, articles in zip(feed_names, results) if articles is not None}
+	if not ingested_articles:
+		print("*** " + env + " ERROR USING SQL DB ***")
+		return False, {}
 	return True, ingested_articles
 	
+# @DEV: Hashed index of the normalized titles returned by get_ingested_articles, so checking a candidate article against a feed's
+# ingested articles is a single set lookup instead of a scan of the whole list.
+class IngestedTitleIndex:
+
+	def __init__(self, ingested_articles):
+		self.titles = {}
+		self.sizes = {}
+		for feed_name, articles in ingested_articles.items():
+			self.titles[feed_name] = frozenset(strip_characters(article['article_title'].lower()) for article in articles)
+			self.sizes[feed_name] = len(articles)
+
+	# @RET: Returns True if get_ingested_articles returned the articles ingested for feed_name
+	def has_feed(self, feed_name):
+		return feed_name in self.titles
+
+	# @RET: Returns True if title, compared with strip_characters(title.lower()), was already ingested for feed_name
+	def has_title(self, feed_name, title):
+		return strip_characters(title.lower()) in self.titles[feed_name]
+
+	# @RET: Returns the number of articles get_ingested_articles returned for feed_name
+	def size(self, feed_name):
+		return self.sizes[feed_name]
+
+
 # @DEV: Strips string of all non-letter or number characters
 # @RET: replaced string
 def strip_characters(title):
@@ -234,10 +674,13 @@ def main(_param_dictionary):
 	else:
 		use_sql = False
 		already_ingested = {}
+	already_ingested = IngestedTitleIndex(already_ingested)
 	#print("**** " + env + " **** ALREADY INGESTED ARTICLES", already_ingested)
 	
 	
-	parsed_feed_map = parse_feed(
+	# Articles are streamed out of iter_articles as each feed finishes and collected into parsed_feed for the ingestion step
+	parsed_feed = {}
+	for file_name, article in iter_articles(
 		_nlu_url = _param_dictionary['sentiment_url'],
 		_nlu_api_key = _param_dictionary['sentiment_apikey'],
 		_classify_id = _param_dictionary['nlc_id'],
@@ -248,10 +691,13 @@ def main(_param_dictionary):
 		_already_ingested = already_ingested,
 		_use_sql = use_sql,
 		translate_url = _param_dictionary["translate_url"],
-		translate_apikey = _param_dictionary["translate_apikey"]
-		)
-
-	parsed_feed = parsed_feed_map['article_map']
+		translate_apikey = _param_dictionary["translate_apikey"],
+		fetch_workers = _param_dictionary.get("fetch_workers", FETCH_MAX_WORKERS),
+		validator_store_path = _param_dictionary.get("validator_store_path", VALIDATOR_STORE_PATH),
+		classification_cache_path = _param_dictionary.get("classification_cache_path", CLASSIFICATION_CACHE_PATH),
+		translation_cache_path = _param_dictionary.get("translation_cache_path", TRANSLATION_CACHE_PATH)
+		):
+		parsed_feed[file_name] = article
 
 	return {
 	'discovery_version': _param_dictionary['discovery_version'],
@@ -0,0 +1,296 @@
+'''Timings behind the performance changes to the action, feedparser and dateutil.
+
+    python benchmarks/bench.py [--before REV] [NAME ...]
+
+Each NAME is the request a benchmark measures (user-001, user-009, user-012,
+user-017, user-018, user-020, user-021); all of them run by default. With
+--before, the same benchmarks also run against REV, exported with git archive,
+and the two columns print side by side. A row whose code does not exist in a
+tree prints '-'. Every benchmark runs in its own interpreter with the tree first
+on sys.path, as the bundled modules are loaded in the deployed action.
+
+To time a single change, pass the commit before it and its name, e.g.
+--before <commit>~1 user-021. Trees older than user-018 have no sgmllib
+replacement, so feedparser there skips html sanitizing and relative URI
+resolution altogether; full parses of html-heavy feeds compared across that
+commit measure the sanitizer being switched on, not the change under test.
+
+Nothing leaves the machine: feeds are served from a local HTTP server and the
+classifier is replaced by a stub, so the timings of user-001 are the fetch
+delay plus parsing.
+'''
+
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import inspect
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FEED_COUNT = 12
+FEED_DELAY = 0.2
+
+
+def best(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def per_call(stmt, namespace, number=20000):
+    return min(timeit.repeat(stmt, globals=namespace, number=number, repeat=5)) / number
+
+
+def load_action(tree):
+    spec = importlib.util.spec_from_file_location('action', os.path.join(tree, '__main__.py'))
+    action = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(action)
+    return action
+
+
+def rss(items, language='en'):
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0" '
+            'xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+            '<title>bench</title><language>%s</language>%s</channel></rss>' % (language, items)).encode('utf-8')
+
+
+def large_feed():
+    # about 3.8 MB: 300 items with long html descriptions and content
+    items = ''.join('<item><title>Story %d</title><link>http://e.com/%d</link>'
+                    '<pubDate>Mon, 06 Sep 2021 16:45:00 +0000</pubDate><description>%s</description>'
+                    '<content:encoded><![CDATA[%s]]></content:encoded></item>'
+                    % (i, i, '&lt;p&gt;a &lt;a href="/x"&gt;b&lt;/a&gt;&lt;/p&gt;' * 50,
+                       '<p>lorem <a href="/r">ipsum</a> dolor sit amet</p>' * 200) for i in range(300))
+    return rss(items)
+
+
+def entry_feed():
+    # 400 items using the elements whose regexes user-020 compiles once
+    items = ''.join('<item><title>Story %d &amp; more</title><link>http://e.com/a?x=%d&amp;y=2</link>'
+                    '<author>joe%d@example.com (Joe)</author><pubDate>Mon, 06 Sep 2021 16:45:00 +0000</pubDate>'
+                    '<description>&lt;p style="color: red; margin: 0"&gt;a &lt;!-- c --&gt;&lt;br/&gt;'
+                    '&lt;a href="/x"&gt;b&lt;/a&gt;&lt;/p&gt;</description>'
+                    '<psc:chapters xmlns:psc="http://podlove.org/simple-chapters">'
+                    '<psc:chapter start="00:01:02.500" title="c"/><psc:chapter start="01:02:03" title="d"/>'
+                    '</psc:chapters></item>' % (i, i, i) for i in range(400))
+    return rss(items)
+
+
+def bench_user_001(tree):
+    import http.server
+    import socketserver
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    def feed(i):
+        items = ''.join('<item><title>Story %d-%d</title><link>http://e.com/news/story-%d-%d/</link>'
+                        '<pubDate>%s</pubDate></item>'
+                        % (i, j, i, j, (now - datetime.timedelta(hours=j)).strftime('%a, %d %b %Y %H:%M:%S +0000'))
+                        for j in range(30))
+        return rss(items)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(FEED_DELAY)
+            body = feed(int(self.path.rsplit('/', 1)[-1]))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    feeds = [{'feed_url': 'http://127.0.0.1:%d/feed/%d' % (server.server_address[1], i),
+              'feed_name': 'feed %d' % i, 'publisher': 'bench',
+              'last_updated_date': (now - datetime.timedelta(days=3)).strftime('%a, %d %b %Y %H:%M:%S +0000')}
+             for i in range(FEED_COUNT)]
+
+    action = load_action(tree)
+    action.classify_text = lambda *args, **kwargs: {'NEGATIVE': 0.1, 'LEAD': 0.9}
+    accepted = inspect.signature(action.parse_feed).parameters
+    # keep the on-disk caches and validators out of the way, so every run fetches and parses every feed
+    options = dict((name, None) for name in ('validator_store_path', 'classification_cache_path', 'translation_cache_path') if name in accepted)
+
+    def run(**kwargs):
+        kwargs.update(options)
+        with contextlib.redirect_stdout(io.StringIO()):
+            action.parse_feed('nlu', 'key', 'classify', 'financial', 'today', None, {}, False, 'translate', 'key', _feed_list=feeds, **kwargs)
+
+    label = 'parse_feed, %d feeds served in %.1f s each' % (FEED_COUNT, FEED_DELAY)
+    if 'fetch_workers' in accepted:
+        yield label + ', one at a time', best(lambda: run(fetch_workers=1), 3), 's'
+        yield label + ', concurrently', best(run, 3), 's'
+    else:
+        yield label + ', one at a time', best(run, 3), 's'
+    server.shutdown()
+
+
+def bench_user_009(tree):
+    action = load_action(tree)
+    rnd = random.Random(9)
+    words = ['market', 'shares', 'bank', 'profit', 'outlook', 'price', 'shop', 'crap', 'hell', 'growth', 'rates', 'deal']
+    slugs = ['-'.join(rnd.choice(words) for _ in range(rnd.randint(3, 9))) for _ in range(20000)]
+
+    def run():
+        for slug in slugs:
+            action.filter_by_title(slug, True)
+
+    yield 'filter_by_title, 20000 slugs', best(run), 's'
+
+
+def bench_user_012(tree):
+    import feedparser
+
+    doc = large_feed()
+    label = 'parse a %.1f MB feed' % (len(doc) / 1e6)
+    yield label + ', all fields', best(lambda: feedparser.parse(doc), 3), 's'
+    if 'fields' in inspect.signature(feedparser.parse).parameters:
+        fields = ['title', 'link', 'published', 'language']
+        yield label + ', fields=%s' % ','.join(fields), best(lambda: feedparser.parse(doc, fields=fields), 3), 's'
+
+
+def bench_user_017(tree):
+    import feedparser
+
+    docs = [entry_feed()] * 12
+    label = 'parse %d feeds of 400 entries' % len(docs)
+    yield label + ', one after another', best(lambda: [feedparser.parse(doc) for doc in docs], 3), 's'
+    if hasattr(feedparser, 'parse_many'):
+        yield label + ', parse_many on %d cpu(s)' % os.cpu_count(), best(lambda: feedparser.parse_many(docs), 3), 's'
+
+
+def bench_user_018(tree):
+    import feedparser
+
+    feedparser.SANITIZE_HTML = 0
+    feedparser.RESOLVE_RELATIVE_URIS = 0
+    doc = large_feed()
+    label = 'parse a %.1f MB feed without sanitizing' % (len(doc) / 1e6)
+    yield label + ', strict parser', best(lambda: feedparser.parse(doc), 3), 's'
+    if feedparser._SGML_AVAILABLE:
+        feedparser._XML_AVAILABLE = 0
+        yield label + ', loose parser', best(lambda: feedparser.parse(doc), 3), 's'
+        feedparser._XML_AVAILABLE = 1
+
+
+def bench_user_020(tree):
+    import feedparser
+
+    doc = entry_feed()
+    yield 'parse a feed of 400 entries, per entry', best(lambda: feedparser.parse(doc), 7) / 400, 'us'
+    sanitizer = feedparser._HTMLSanitizer('utf-8', 'text/html')
+    author = feedparser._StrictFeedParser('', '', 'utf-8')
+    author.inentry = 1
+    author.entries = [feedparser.FeedParserDict(author='joe@example.com (Joe)')]
+    namespace = dict(feedparser=feedparser, sanitizer=sanitizer, author=author)
+    for label, stmt in [('_parse_psc_chapter_start', 'feedparser._parse_psc_chapter_start("00:01:02.500")'),
+                        ('_parse_date_perforce', 'feedparser._parse_date_perforce("Fri, 2006/09/15 08:19:53 EDT")'),
+                        ('lookslikehtml', 'feedparser._FeedParserMixin.lookslikehtml("a &amp; <b>b</b> &copy;")'),
+                        ('sanitize_style', 'sanitizer.sanitize_style("color: red; margin: 0; background: url(x)")'),
+                        ('_sync_author_detail, email author', 'author._sync_author_detail()')]:
+        yield label, per_call(stmt, namespace), 'us'
+
+
+def bench_user_021(tree):
+    from dateutil import parser
+
+    rnd = random.Random(1)
+    dates = [datetime.datetime(2000, 1, 1) + datetime.timedelta(seconds=rnd.randrange(10 ** 9)) for _ in range(20000)]
+    for label, fmt in [('RFC 822', '%a, %d %b %Y %H:%M:%S +0000'), ('ISO 8601', '%Y-%m-%dT%H:%M:%S.%f+02:00')]:
+        strings = [date.strftime(fmt) for date in dates]
+        yield 'dateutil parse, %s, per date' % label, best(lambda: [parser.parse(s) for s in strings], 3) / len(strings), 'us'
+        if hasattr(parser, 'parse_many'):
+            yield 'dateutil parse_many, %s, per date' % label, best(lambda: parser.parse_many(strings), 3) / len(strings), 'us'
+
+
+BENCHMARKS = dict((name[len('bench_'):].replace('_', '-'), fn) for name, fn in list(globals().items()) if name.startswith('bench_user_'))
+
+
+def run_tree(tree, names):
+    '''Runs each benchmark in a child interpreter that imports from tree, and returns their rows.'''
+    rows = {}
+    for name in names:
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--tree', tree, name], cwd=tree)
+        rows.update(json.loads(output.decode('utf-8').splitlines()[-1]))
+    return rows
+
+
+def export_tree(rev, path):
+    archive = subprocess.Popen(['git', 'archive', rev], cwd=ROOT, stdout=subprocess.PIPE)
+    subprocess.check_call(['tar', '-x', '-C', path], stdin=archive.stdout)
+    archive.stdout.close()
+    if archive.wait():
+        raise SystemExit('git archive %s failed' % rev)
+
+
+def fmt(value, unit):
+    if value is None:
+        return '-'
+    return '%.3f s' % value if unit == 's' else '%.1f us' % (value * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('names', nargs='*', metavar='NAME', help='benchmarks to run: %s' % ', '.join(sorted(BENCHMARKS)))
+    parser.add_argument('--before', metavar='REV', help='also run the benchmarks against this git revision')
+    parser.add_argument('--tree', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    names = args.names or sorted(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error('unknown benchmark: %s' % ', '.join(sorted(unknown)))
+
+    if args.tree:
+        sys.path.insert(0, args.tree)
+        rows = dict((name, [list(row) for row in BENCHMARKS[name](args.tree)]) for name in names)
+        print(json.dumps(rows))
+        return
+
+    columns = []
+    if args.before:
+        before = tempfile.mkdtemp()
+        try:
+            export_tree(args.before, before)
+            columns.append((args.before, run_tree(before, names)))
+        finally:
+            shutil.rmtree(before)
+    columns.append(('working tree', run_tree(ROOT, names)))
+
+    for name in names:
+        labels = []
+        for _, rows in columns:
+            labels.extend(label for label, _, _ in rows[name] if label not in labels)
+        print(name)
+        for label in labels:
+            cells = []
+            for _, rows in columns:
+                found = [(value, unit) for row_label, value, unit in rows[name] if row_label == label]
+                cells.append(fmt(*found[0]) if found else '-')
+            print('  %-60s %s' % (label, '  '.join('%12s' % cell for cell in cells)))
+    print('columns: %s' % ', '.join(title for title, _ in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from ._parser import parse, parser, parserinfo
+from ._parser import parse, parse_many, parsecache, parser, parserinfo
 from ._parser import DEFAULTPARSER, DEFAULTTZPARSER
 from ._parser import UnknownTimezoneWarning
 
@@ -7,7 +7,7 @@ from ._parser import __doc__
 
 from .isoparser import isoparser, isoparse
 
-__all__ = ['parse', 'parser', 'parserinfo',
+__all__ = ['parse', 'parse_many', 'parsecache', 'parser', 'parserinfo',
            'isoparse', 'isoparser',
            'UnknownTimezoneWarning']
 
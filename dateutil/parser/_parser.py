@@ -37,10 +37,12 @@ import time
 import warnings
 
 from calendar import monthrange
+from collections import OrderedDict, deque, namedtuple
 from io import StringIO
 
 import six
 from six import binary_type, integer_types, text_type
+from six.moves import _thread
 
 from decimal import Decimal
 
@@ -49,7 +51,7 @@ from warnings import warn
 from .. import relativedelta
 from .. import tz
 
-__all__ = ["parse", "parserinfo"]
+__all__ = ["parse", "parse_many", "parsecache", "parserinfo"]
 
 
 # TODO: pandas.core.tools.datetimes imports this explicitly.  Might be worth
@@ -59,6 +61,20 @@ class _timelex(object):
     # Fractional seconds are sometimes split by a comma
     _split_decimal = re.compile("([.,])")
 
+    # The tokens get_token() reads from an ASCII string, in one pass: a word
+    # or a number, with the dot-separated runs that follow it (a run may only
+    # switch between letters and digits right after a dot, and a comma may
+    # only follow two or more digits); a space; or any other character.
+    _ascii = re.compile(r'[\x00-\x7f]*\Z')
+    _printable = re.compile(r'[ -~]*\Z')
+    _ascii_spaces = dict((i, ' ') for i in range(128)
+                         if six.unichr(i).isspace())
+    _ascii_spaces[0] = None
+    _ascii_token = re.compile(r'[A-Za-z]+(?:\.+(?:[A-Za-z]+|[0-9]+)?)*|'
+                              r'[0-9]+(?:(?<=[0-9]{2}),[0-9]*)?'
+                              r'(?:\.+(?:[A-Za-z]+|[0-9]+)?)*|'
+                              r'.', re.DOTALL)
+
     def __init__(self, instream):
         if six.PY2:
             # In Python 2, we can't duck type properly because unicode has
@@ -76,8 +92,8 @@ class _timelex(object):
                             '{itype}'.format(itype=instream.__class__.__name__))
 
         self.instream = instream
-        self.charstack = []
-        self.tokenstack = []
+        self.charstack = deque()
+        self.tokenstack = deque()
         self.eof = False
 
     def get_token(self):
@@ -95,7 +111,7 @@ class _timelex(object):
         demands that multiple tokens be parsed at once.
         """
         if self.tokenstack:
-            return self.tokenstack.pop(0)
+            return self.tokenstack.popleft()
 
         seenletters = False
         token = None
@@ -107,7 +123,7 @@ class _timelex(object):
             # that character may be part of the next token, it's stored in the
             # charstack.
             if self.charstack:
-                nextchar = self.charstack.pop(0)
+                nextchar = self.charstack.popleft()
             else:
                 nextchar = self.instream.read(1)
                 while nextchar == '\x00':
@@ -204,8 +220,50 @@ class _timelex(object):
 
     @classmethod
     def split(cls, s):
+        if cls is _timelex and isinstance(s, text_type):
+            if not cls._printable.match(s):
+                if not cls._ascii.match(s):
+                    return list(cls(s))
+                s = s.translate(cls._ascii_spaces)
+            return cls._split_ascii(s)
         return list(cls(s))
 
+    @classmethod
+    def _split_ascii(cls, s):
+        """
+        Same as ``list(cls(s))`` for a printable ASCII string, without going
+        through ``get_token`` one character at a time.
+        """
+        tokens = cls._ascii_token.findall(s)
+        if '.' not in s and ',' not in s:
+            return tokens
+
+        l = []
+        last = len(tokens) - 1
+        for i, token in enumerate(tokens):
+            if len(token) < 2 or ('.' not in token and ',' not in token):
+                l.append(token)
+                continue
+
+            # A dotted token is broken up, as in get_token, if any character
+            # was read after its first letter. For a token that starts with a
+            # number, that only fails to happen if its one letter is the last
+            # character of the string.
+            if token[0].isalpha():
+                seenletters = True
+            else:
+                digits = token.replace('.', '').replace(',', '')
+                seenletters = not (digits.isdigit() or
+                                   (i == last and digits[:-1].isdigit()))
+
+            if seenletters or token.count('.') > 1 or token[-1] in '.,':
+                l.extend(tok for tok in cls._split_decimal.split(token) if tok)
+            elif token[-1].isdigit() and '.' not in token:
+                l.append(token.replace(',', '.'))
+            else:
+                l.append(token)
+        return l
+
     @classmethod
     def isword(cls, nextchar):
         """ Whether or not the next character is part of a word """
@@ -570,9 +628,31 @@ class _ymd(list):
         return year, month, day
 
 
+# Two ASCII strings that differ only in which digits and letters they hold
+# split into tokens at the same places, so the parser can remember how it read
+# one of them and replay that for the next (see ``parser._compile_layout``).
+_LAYOUT_CHARS = re.compile(r'[\x01-\x7f]*\Z')
+_LAYOUT_SHAPE = {}
+for _i in range(1, 128):
+    _c = six.unichr(_i)
+    if _c.isdigit():
+        _LAYOUT_SHAPE[_i] = '9'
+    elif _c.isalpha():
+        _LAYOUT_SHAPE[_i] = 'a'
+    elif _c.isspace():
+        _LAYOUT_SHAPE[_i] = ' '
+del _i, _c
+
+_LAYOUT_CACHE_SIZE = 256
+
+# Words float() accepts, which _parse treats as numbers rather than names
+_FLOAT_WORDS = frozenset(['inf', 'infinity', 'nan'])
+
+
 class parser(object):
     def __init__(self, info=None):
         self.info = info or parserinfo()
+        self._layouts = {}
 
     def parse(self, timestr, default=None,
               ignoretz=False, tzinfos=None, **kwargs):
@@ -660,6 +740,39 @@ class parser(object):
         else:
             return ret
 
+    def parse_many(self, timestrs, default=None,
+                   ignoretz=False, tzinfos=None, **kwargs):
+        """
+        Parse each of a sequence of date/time strings, as :meth:`parse` would.
+
+        Feeds and logs tend to write every date in the same format. After
+        reading the first string of a given shape (the same punctuation,
+        with digits and letters in the same places), the parser remembers
+        which token went where and reads later strings of that shape without
+        going through the general tokenizer. :meth:`parse` uses the same
+        cache; this method also works out ``default`` only once.
+
+        :param timestrs:
+            An iterable of date/time strings.
+
+        The other parameters are as for :meth:`parse`, and apply to every
+        string.
+
+        :return:
+            Returns a list with the result of :meth:`parse` for each string.
+
+        :raises ValueError:
+            Raised as by :meth:`parse`, for the first string that cannot be
+            parsed.
+        """
+
+        if default is None:
+            default = datetime.datetime.now().replace(hour=0, minute=0,
+                                                      second=0, microsecond=0)
+
+        return [self.parse(timestr, default, ignoretz, tzinfos, **kwargs)
+                for timestr in timestrs]
+
     class _result(_resultbase):
         __slots__ = ["year", "month", "day", "weekday",
                      "hour", "minute", "second", "microsecond",
@@ -717,6 +830,15 @@ class parser(object):
         if yearfirst is None:
             yearfirst = info.yearfirst
 
+        layout_key = None
+        if not fuzzy:
+            layout_key = self._layout_key(timestr)
+            layout = self._layouts.get(layout_key)
+            if layout:
+                res = self._parse_layout(layout, timestr, dayfirst, yearfirst)
+                if res is not None:
+                    return res, None
+
         res = self._result()
         l = _timelex.split(timestr)         # Splits the timestr into tokens
 
@@ -872,8 +994,257 @@ class parser(object):
             skipped_tokens = self._recombine_skipped(l, skipped_idxs)
             return res, tuple(skipped_tokens)
         else:
+            if layout_key is not None and layout_key not in self._layouts:
+                if len(self._layouts) >= _LAYOUT_CACHE_SIZE:
+                    self._layouts.clear()
+                self._layouts[layout_key] = self._compile_layout(
+                    timestr, res, dayfirst, yearfirst)
             return res, None
 
+    def _layout_key(self, timestr):
+        # Only plain ASCII strings are cached: bytes and streams go through
+        # _timelex's own decoding, and str.isdigit() and friends accept far
+        # more than the ASCII classes _LAYOUT_SHAPE folds together.
+        if (not isinstance(timestr, text_type) or
+                not _LAYOUT_CHARS.match(timestr)):
+            return None
+        return timestr.translate(_LAYOUT_SHAPE)
+
+    def _layout_role(self, token, res):
+        """
+        Which branch of the ``_parse`` loop a word token takes, or ``None``
+        if it is one the layouts do not handle (hms and am/pm words, which
+        change how the neighbouring numbers are read).
+        """
+        info = self.info
+        if (token.lower() in _FLOAT_WORDS or info.hms(token) is not None or
+                info.ampm(token) is not None):
+            return None
+        if info.weekday(token) is not None:
+            return 'weekday'
+        if info.month(token) is not None:
+            return 'month'
+        if self._could_be_tzname(res.hour, res.tzname, res.tzoffset, token):
+            return 'tzname'
+        if info.jump(token):
+            return 'jump'
+        return None
+
+    def _compile_layout(self, timestr, res, dayfirst, yearfirst):
+        """
+        Record the steps ``_parse`` took to read ``timestr`` as a layout that
+        ``_parse_layout`` can replay for any string of the same shape, or
+        return ``()`` if ``timestr`` is not one of the RFC 822 or ISO 8601
+        forms handled here::
+
+            [Mon, ]06 Sep 2021[ 16:45[:00][ +0000 (UTC)| GMT]]
+            2021-09-06[T16:45[:00[.123]][Z|+02:00]]
+
+        Each step names the token it reads by its span in the string.
+        ``res`` is what ``_parse`` made of ``timestr``; the layout is only
+        kept if replaying it gives the same result.
+        """
+        l = _timelex.split(timestr)
+        spans = []
+        pos = 0
+        for token in l:
+            end = pos + len(token)
+            text = timestr[pos:end]
+            if text != token and not (token == ' ' and text.isspace()):
+                # _timelex rewrote the token (a decimal comma, say)
+                return ()
+            spans.append((pos, end))
+            pos = end
+        if pos != len(timestr):
+            return ()
+
+        len_l = len(l)
+        l = l + [''] * 6    # lookahead past the end compares as no token
+        state = self._result()
+        layout = []
+        i = 0
+
+        def isdigit(token, *lengths):
+            return token.isdigit() and len(token) in lengths
+
+        # Weekday
+        if l[i].isalpha() and self._layout_role(l[i], state) == 'weekday':
+            layout.append(('weekday', spans[i]))
+            i += 1
+            while l[i] in (',', ' '):
+                i += 1
+
+        # Date
+        if (isdigit(l[i], 1, 2) and l[i + 1] == ' ' and l[i + 2].isalpha() and
+                l[i + 3] == ' ' and isdigit(l[i + 4], 2, 4)):
+            # 06 Sep 2021
+            pertain = None
+            if i + 6 < len_l and l[i + 5] == ' ':
+                pertain = spans[i + 4]
+            layout.append(('value', spans[i]))
+            layout.append(('month', spans[i + 2], pertain))
+            layout.append(('value', spans[i + 4]))
+        elif (isdigit(l[i], 4) and l[i + 1] == '-' and isdigit(l[i + 2], 2) and
+                l[i + 3] == '-' and isdigit(l[i + 4], 2)):
+            # 2021-09-06
+            layout.append(('string', spans[i]))
+            layout.append(('string', spans[i + 2]))
+            layout.append(('month_or_string', spans[i + 4]))
+        else:
+            return ()
+        i += 5
+
+        # Time
+        if i < len_l:
+            if l[i].isalpha() and self._layout_role(l[i], state) == 'jump':
+                layout.append(('jump', spans[i]))
+            elif l[i] != ' ':
+                return ()
+            i += 1
+
+            if not (isdigit(l[i], 1, 2) and l[i + 1] == ':' and
+                    isdigit(l[i + 2], 2)):
+                return ()
+            if l[i + 3] == ':' and l[i + 4].replace('.', '', 1).isdigit():
+                layout.append(('time', spans[i], spans[i + 2], spans[i + 4]))
+                i += 5
+            else:
+                layout.append(('time', spans[i], spans[i + 2], None))
+                i += 3
+            state.hour = 0
+
+        # Time zone
+        if i < len_l:
+            if l[i] == ' ':
+                i += 1
+            if l[i] in ('+', '-') and l[i + 1].isdigit():
+                signal = (-1, 1)[l[i] == '+']
+                start, end = spans[i + 1]
+                if len(l[i + 1]) == 4:
+                    # -0300
+                    layout.append(('offset', (start, start + 2),
+                                   (start + 2, end), signal))
+                    i += 2
+                elif l[i + 2] == ':' and l[i + 3].isdigit():
+                    # -03:00
+                    layout.append(('offset', spans[i + 1], spans[i + 3],
+                                   signal))
+                    i += 4
+                elif len(l[i + 1]) <= 2 and l[i + 2] != ':':
+                    # -[0]3
+                    layout.append(('offset', spans[i + 1], None, signal))
+                    i += 2
+                else:
+                    return ()
+                if (i + 3 < len_l and l[i] == ' ' and l[i + 1] == '(' and
+                        l[i + 2].isalpha() and len(l[i + 2]) >= 3 and
+                        l[i + 3] == ')'):
+                    # -0300 (BRST)
+                    layout.append(('paren', spans[i + 2]))
+                    i += 4
+            elif (l[i].isalpha() and
+                    self._layout_role(l[i], state) == 'tzname'):
+                layout.append(('tzname', spans[i]))
+                i += 1
+            else:
+                return ()
+
+        if i != len_l:
+            return ()
+
+        layout = tuple(layout)
+        check = self._parse_layout(layout, timestr, dayfirst, yearfirst)
+        if check is None or any(getattr(check, attr) != getattr(res, attr)
+                                for attr in res.__slots__):
+            return ()
+        if check.century_specified != res.century_specified:
+            return ()
+        return layout
+
+    def _parse_layout(self, layout, timestr, dayfirst, yearfirst):
+        """
+        Replay a layout from ``_compile_layout`` on ``timestr``. Returns
+        ``None`` whenever ``_parse`` might not have taken the same steps, in
+        which case the caller parses the string the long way.
+        """
+        info = self.info
+        res = self._result()
+        ymd = _ymd()
+
+        try:
+            for step in layout:
+                kind = step[0]
+                start, end = step[1]
+                token = timestr[start:end]
+
+                if kind == 'value':
+                    ymd.append(self._to_decimal(token))
+
+                elif kind == 'string':
+                    ymd.append(token)
+
+                elif kind == 'month_or_string':
+                    value = info.month(token)
+                    if value is not None:
+                        ymd.append(value, 'M')
+                    else:
+                        ymd.append(token)
+
+                elif kind == 'time':
+                    res.hour = int(self._to_decimal(token))
+                    start, end = step[2]
+                    value = self._to_decimal(timestr[start:end])
+                    (res.minute, res.second) = self._parse_min_sec(value)
+                    if step[3] is not None:
+                        start, end = step[3]
+                        res.second, res.microsecond = self._parsems(
+                            timestr[start:end])
+
+                elif kind == 'offset':
+                    hour_offset = int(token)
+                    min_offset = 0
+                    if step[2] is not None:
+                        start, end = step[2]
+                        min_offset = int(timestr[start:end])
+                    res.tzoffset = step[3] * (hour_offset * 3600 +
+                                              min_offset * 60)
+
+                elif kind == 'paren':
+                    if not self._could_be_tzname(res.hour, res.tzname,
+                                                 None, token):
+                        return None
+                    res.tzname = token
+
+                elif self._layout_role(token, res) != kind:
+                    return None
+
+                elif kind == 'weekday':
+                    res.weekday = info.weekday(token)
+
+                elif kind == 'month':
+                    if step[2] is not None:
+                        start, end = step[2]
+                        if info.pertain(timestr[start:end]):
+                            return None
+                    ymd.append(info.month(token), 'M')
+
+                elif kind == 'tzname':
+                    res.tzname = token
+                    res.tzoffset = info.tzoffset(token)
+
+            year, month, day = ymd.resolve_ymd(yearfirst, dayfirst)
+        except (IndexError, ValueError):
+            return None
+
+        res.century_specified = ymd.century_specified
+        res.year = year
+        res.month = month
+        res.day = day
+
+        if not info.validate(res):
+            return None
+        return res
+
     def _parse_numeric_token(self, tokens, idx, info, ymd, res, fuzzy):
         # Token is a number
         value_repr = tokens[idx]
@@ -1356,6 +1727,138 @@ def parse(timestr, parserinfo=None, **kwargs):
         return DEFAULTPARSER.parse(timestr, **kwargs)
 
 
+def parse_many(timestrs, parserinfo=None, **kwargs):
+    """
+    Parse each of a sequence of date/time strings, using the ``parserinfo``
+    parameters. This is quicker than calling :func:`parse` on each string
+    when many of them share a format; see :meth:`parser.parse_many`.
+
+    :param timestrs:
+        An iterable of date/time strings.
+
+    :param parserinfo:
+        A :class:`parserinfo` object containing parameters for the parser.
+        If ``None``, the default arguments to the :class:`parserinfo`
+        constructor are used.
+
+    The ``**kwargs`` parameter takes the same keyword arguments as
+    :func:`parse`.
+
+    :return:
+        Returns a list of :class:`datetime.datetime` objects (or tuples, if
+        ``fuzzy_with_tokens`` is ``True``), one for each string.
+
+    :raises ValueError:
+        Raised as by :func:`parse`, for the first string that cannot be
+        parsed.
+    """
+    if parserinfo:
+        return parser(parserinfo).parse_many(timestrs, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_many(timestrs, **kwargs)
+
+
+class parsecache(object):
+    """
+    A bounded, least-recently-used cache in front of :func:`parse`, for
+    callers that see the same few date/time strings over and over.
+
+    Calling the cache parses a string as :func:`parse` would, with the same
+    keyword arguments, and remembers the result for the next call with that
+    string and those arguments. When ``default`` is not given, it is today's
+    date at midnight as for :func:`parse`, and is part of the key, so a
+    string missing a date element is parsed again on a new day. So are the
+    local time zone names, which decide whether a string's zone is read as
+    :class:`dateutil.tz.tzlocal`. Calls with ``tzinfos`` are passed straight
+    to :func:`parse`, since it may be a mapping or a function. Failed parses
+    are not cached.
+
+    :class:`datetime.datetime` objects are immutable, so the one result is
+    returned to every caller.
+
+    :param maxsize:
+        The number of results to keep. Once full, the least recently used
+        result is dropped to make room.
+
+    :param parserinfo:
+        A :class:`parserinfo` object containing parameters for the parser.
+        If ``None``, the default arguments to the :class:`parserinfo`
+        constructor are used.
+
+    .. doctest::
+
+        >>> from dateutil.parser import parsecache
+        >>> cached_parse = parsecache(maxsize=128)
+        >>> cached_parse("2003-09-25T10:49:41")
+        datetime.datetime(2003, 9, 25, 10, 49, 41)
+        >>> cached_parse("2003-09-25T10:49:41")
+        datetime.datetime(2003, 9, 25, 10, 49, 41)
+        >>> cached_parse.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
+    """
+
+    CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize',
+                                         'currsize'])
+
+    def __init__(self, maxsize=1024, parserinfo=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+
+        self.maxsize = maxsize
+        self._parser = parser(parserinfo) if parserinfo else DEFAULTPARSER
+        self._cache = OrderedDict()
+        self._cache_lock = _thread.allocate_lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, timestr, default=None, ignoretz=False, tzinfos=None,
+                 **kwargs):
+        cacheable = isinstance(timestr, (text_type, binary_type))
+        if tzinfos is not None or not cacheable:
+            return self._parser.parse(timestr, default, ignoretz, tzinfos,
+                                      **kwargs)
+
+        if default is None:
+            default = datetime.datetime.now().replace(hour=0, minute=0,
+                                                      second=0, microsecond=0)
+
+        key = (timestr, default, ignoretz, time.tzname,
+               tuple(sorted(kwargs.items())))
+        with self._cache_lock:
+            try:
+                # Move the result to the most recently used end
+                rv = self._cache[key] = self._cache.pop(key)
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                return rv
+
+        rv = self._parser.parse(timestr, default, ignoretz, **kwargs)
+        with self._cache_lock:
+            self._cache[key] = rv
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return rv
+
+    def cache_info(self):
+        """
+        Return the hit and miss counts and the current and maximum size of
+        the cache, as a named tuple like ``functools.lru_cache`` reports.
+        """
+        with self._cache_lock:
+            return self.CacheInfo(self.hits, self.misses, self.maxsize,
+                                  len(self._cache))
+
+    def cache_clear(self):
+        """Empty the cache and reset its statistics."""
+        with self._cache_lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
 class _tzparser(object):
 
     class _result(_resultbase):
@@ -7,8 +7,16 @@ datetimes.
 """
 from __future__ import unicode_literals
 
+from array import array
 from datetime import datetime, time
 
+import six
+
+from dateutil import tz
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=tz.UTC)
+
 
 def today(tzinfo=None):
     """
@@ -69,3 +77,89 @@ def within_delta(dt1, dt2, delta):
     delta = abs(delta)
     difference = dt1 - dt2
     return -delta <= difference <= delta
+
+
+def epoch_millis(values, tzinfo=tz.UTC, parse=None):
+    """
+    Converts date/time strings or datetimes to milliseconds since the Unix
+    epoch, all in one go.
+
+    Aware datetimes are converted with their UTC offset. Naive ones are taken
+    to be in ``tzinfo``, and strings are parsed first.
+
+    .. doctest::
+
+        >>> from dateutil.utils import epoch_millis
+        >>> epoch_millis(['Mon, 20 May 2019 18:00:56 +0000',
+        ...               'Mon, 20 May 2019 13:00:56 -0500'])
+        array('q', [1558375256000, 1558375256000])
+
+    :param values:
+        An iterable of :py:class:`datetime.datetime` objects or strings.
+
+    :param tzinfo:
+        The time zone of naive datetimes, and of strings without one. UTC
+        by default.
+
+    :param parse:
+        The function strings are parsed with. If ``None``,
+        :func:`dateutil.parser.parse` is used; a
+        :class:`dateutil.parser.parsecache` is a good choice when the same
+        strings come up often.
+
+    :return:
+        Returns an ``array('q')`` of integer milliseconds, truncated towards
+        the past. ``numpy.frombuffer(millis, dtype=numpy.int64)`` views it as
+        a NumPy array without copying.
+    """
+    if parse is None:
+        from dateutil.parser import parse
+
+    millis = array('q')
+    for dt in values:
+        if isinstance(dt, six.string_types):
+            dt = parse(dt)
+
+        if dt.utcoffset() is not None:
+            delta = dt - _EPOCH_UTC
+        elif tzinfo is tz.UTC:
+            # Naive UTC: no need to go through utcoffset() again
+            delta = dt.replace(tzinfo=None) - _EPOCH
+        else:
+            delta = dt.replace(tzinfo=tzinfo) - _EPOCH_UTC
+
+        millis.append(delta.days * 86400000 + delta.seconds * 1000 +
+                      delta.microseconds // 1000)
+    return millis
+
+
+def within_window(millis, start, end, inclusive=False):
+    """
+    Checks a batch of epoch milliseconds, such as :func:`epoch_millis`
+    returns, against a time window.
+
+    :param millis:
+        A sequence of milliseconds since the epoch. If it is a NumPy array,
+        the comparisons are done element-wise by NumPy.
+
+    :param start:
+        The start of the window, in milliseconds since the epoch.
+
+    :param end:
+        The end of the window, in milliseconds since the epoch.
+
+    :param inclusive:
+        If ``True``, values equal to ``start`` or ``end`` are in the window.
+
+    :return:
+        Returns a list of booleans, one for each value, or a boolean NumPy
+        array if ``millis`` is a NumPy array.
+    """
+    if hasattr(millis, '__array__'):
+        if inclusive:
+            return (millis >= start) & (millis <= end)
+        return (millis > start) & (millis < end)
+
+    if inclusive:
+        return [start <= ms <= end for ms in millis]
+    return [start < ms < end for ms in millis]
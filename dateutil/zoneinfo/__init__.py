@@ -8,6 +8,11 @@ from io import BytesIO
 
 from dateutil.tz import tzfile as _tzfile
 
+try:
+    from collections.abc import MutableMapping
+except ImportError:  # Python 2
+    from collections import MutableMapping
+
 __all__ = ["get_zonefile_instance", "gettz", "gettz_db_metadata"]
 
 ZONEFILENAME = "dateutil-zoneinfo.tar.gz"
@@ -27,19 +32,92 @@ def getzoneinfofile_stream():
         return None
 
 
+class _LazyZones(MutableMapping):
+    """
+    The ``zones`` of a :class:`ZoneInfoFile` opened with ``lazy=True``. It
+    holds the uncompressed tarball and where each member starts in it, and
+    only builds the :class:`tzfile` for a zone the first time it is looked up.
+    """
+
+    def __init__(self, tf):
+        # name -> (offset, size) of a zone file, or the name a link points to
+        self._index = {}
+        links = {}
+        for zf in tf.getmembers():
+            if zf.isfile() and zf.name != METADATA_FN:
+                self._index[zf.name] = (zf.offset_data, zf.size)
+            elif zf.islnk() or zf.issym():
+                links[zf.name] = zf.linkname
+        self._index.update(links)
+
+        # Member offsets count from the start of the uncompressed stream
+        tf.fileobj.seek(0)
+        self._data = tf.fileobj.read()
+        self._zones = {}
+
+    def __getitem__(self, name):
+        try:
+            return self._zones[name]
+        except KeyError:
+            pass
+
+        entry = self._index[name]
+        if isinstance(entry, tuple):
+            offset, size = entry
+            zone = tzfile(BytesIO(self._data[offset:offset + size]),
+                          filename=name)
+        else:
+            # Links point to their parent object, as in the eager mapping
+            zone = self[entry]
+        return self._zones.setdefault(name, zone)
+
+    def __setitem__(self, name, zone):
+        self._zones[name] = zone
+        self._index[name] = None
+
+    def __delitem__(self, name):
+        del self._index[name]
+        self._zones.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
 class ZoneInfoFile(object):
-    def __init__(self, zonefile_stream=None):
+    """
+    The zones of a zoneinfo tarball, such as the one bundled with ``dateutil``.
+
+    :param zonefile_stream:
+        A file-like object holding the tarball. If ``None``, there are no
+        zones.
+
+    :param lazy:
+        If ``True``, only index the tarball here, and build each zone's
+        :class:`tzfile` the first time it is looked up. ``zones`` is then a
+        mapping rather than a :class:`dict`. Otherwise every zone is built
+        up front.
+    """
+    def __init__(self, zonefile_stream=None, lazy=False):
         if zonefile_stream is not None:
             with TarFile.open(fileobj=zonefile_stream) as tf:
-                self.zones = {zf.name: tzfile(tf.extractfile(zf), filename=zf.name)
-                              for zf in tf.getmembers()
-                              if zf.isfile() and zf.name != METADATA_FN}
-                # deal with links: They'll point to their parent object. Less
-                # waste of memory
-                links = {zl.name: self.zones[zl.linkname]
-                         for zl in tf.getmembers() if
-                         zl.islnk() or zl.issym()}
-                self.zones.update(links)
+                if lazy:
+                    self.zones = _LazyZones(tf)
+                else:
+                    self.zones = {zf.name: tzfile(tf.extractfile(zf), filename=zf.name)
+                                  for zf in tf.getmembers()
+                                  if zf.isfile() and zf.name != METADATA_FN}
+                    # deal with links: They'll point to their parent object. Less
+                    # waste of memory
+                    links = {zl.name: self.zones[zl.linkname]
+                             for zl in tf.getmembers() if
+                             zl.islnk() or zl.issym()}
+                    self.zones.update(links)
                 try:
                     metadata_json = tf.extractfile(tf.getmember(METADATA_FN))
                     metadata_str = metadata_json.read().decode('UTF-8')
@@ -83,6 +161,9 @@ def get_zonefile_instance(new_instance=False):
     instance using the data provided by the ``dateutil`` package. By default, it
     caches a single instance of the ZoneInfoFile object and returns that.
 
+    The instance is opened with ``lazy=True``, so each zone is only read from
+    the tarball when it is first asked for.
+
     :param new_instance:
         If ``True``, a new instance of :class:`ZoneInfoFile` is instantiated and
         used as the cached instance for the next call. Otherwise, new instances
@@ -99,7 +180,7 @@ def get_zonefile_instance(new_instance=False):
         zif = getattr(get_zonefile_instance, '_cached_instance', None)
 
     if zif is None:
-        zif = ZoneInfoFile(getzoneinfofile_stream())
+        zif = ZoneInfoFile(getzoneinfofile_stream(), lazy=True)
 
         get_zonefile_instance._cached_instance = zif
 
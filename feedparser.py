@@ -69,6 +69,13 @@ RESOLVE_RELATIVE_URIS = 1
 # HTML content, set this to 1.
 SANITIZE_HTML = 1
 
+# Number of bytes read from the network at a time when parse() is called
+# with streaming=True.
+STREAMING_CHUNK_SIZE = 64 * 1024
+
+# Number of feeds parse_many() downloads at once.
+PARSE_MANY_DOWNLOAD_WORKERS = 16
+
 # ---------- Python 3 modules (make it work if possible) ----------
 try:
     import rfc822
@@ -132,11 +139,16 @@ ACCEPTABLE_URI_SCHEMES = (
 # ---------- required modules (should come with any Python distribution) ----------
 import cgi
 import codecs
+import concurrent.futures
 import copy
+import copyreg
 import datetime
+import http.client
 import itertools
+import os
 import re
 import struct
+import threading
 import time
 import types
 import urllib.request, urllib.parse, urllib.error
@@ -191,20 +203,55 @@ else:
         _XML_AVAILABLE = 1
 
 # sgmllib is not available by default in Python 3; if the end user doesn't have
-# it available then we'll lose illformed XML parsing and content santizing
+# it available then illformed XML parsing and content sanitizing fall back on
+# the more lenient html.parser tokenizer
 try:
     import sgmllib
 except ImportError:
     # This is probably Python 3, which doesn't include sgmllib anymore
-    _SGML_AVAILABLE = 0
+    from html.parser import HTMLParser as _HTMLParser
+    _SGML_AVAILABLE = 1
 
-    # Mock sgmllib enough to allow subclassing later on
+    # Stand in for sgmllib with an html.parser.HTMLParser that reports the
+    # same events, so that _BaseHTMLProcessor and its subclasses can use it
     class sgmllib(object):
-        class SGMLParser(object):
-            def goahead(self, i):
-                pass
+        # raised by _markupbase for declarations it can't make sense of
+        SGMLParseError = AssertionError
+
+        class SGMLParser(_HTMLParser):
+            # sgmllib has no raw text elements; parse <script> and <style>
+            # contents as markup too
+            CDATA_CONTENT_ELEMENTS = ()
+
+            def __init__(self):
+                _HTMLParser.__init__(self, convert_charrefs=False)
+
+            # _BaseHTMLProcessor copies the code of these two methods, so they
+            # must be defined in this module rather than inherited
+            def goahead(self, end):
+                return _HTMLParser.goahead(self, end)
+
             def parse_starttag(self, i):
-                pass
+                return _HTMLParser.parse_starttag(self, i)
+
+            def parse_html_declaration(self, i):
+                # let subclasses handle <![CDATA[ and <!DOCTYPE as with sgmllib
+                if self.rawdata.startswith('<!--', i):
+                    return self.parse_comment(i)
+                return self.parse_declaration(i)
+
+            def handle_starttag(self, tag, attrs):
+                # html.parser unescapes attribute values, which sgmllib leaves
+                # alone; keep ampersands escaped as callers expect, and give
+                # bare attributes their own name as a value, as sgmllib does
+                attrs = [(k, v is None and k or v.replace('&', '&amp;')) for k, v in attrs]
+                self.unknown_starttag(tag, attrs)
+
+            # sgmllib reports <br/> as a start tag only
+            handle_startendtag = handle_starttag
+
+            def handle_endtag(self, tag):
+                self.unknown_endtag(tag)
 else:
     _SGML_AVAILABLE = 1
 
@@ -270,6 +317,10 @@ class CharacterEncodingUnknown(ThingsNobodyCaresAboutButMe): pass
 class NonXMLContentType(ThingsNobodyCaresAboutButMe): pass
 class UndeclaredNamespace(Exception): pass
 
+class _StopParsing(Exception):
+    '''Raised by the parser to end the parse once max_entries or since (see
+    parse()) says that no more entries are wanted.'''
+
 SUPPORTED_VERSIONS = {'': 'unknown',
                       'rss090': 'RSS 0.90',
                       'rss091n': 'RSS 0.91 (Netscape)',
@@ -288,6 +339,33 @@ SUPPORTED_VERSIONS = {'': 'unknown',
                       'cdf': 'CDF',
                       }
 
+# Elements read for each field named in parse(fields=...); any other field
+# name is read from the element of the same name (e.g. 'dc_subject').
+PROJECTION_ELEMENTS = {'title': ('title', 'dc_title', 'media_title'),
+                       'link': ('link', 'guid'),
+                       'id': ('guid', 'id'),
+                       'published': ('published', 'pubdate', 'issued', 'dcterms_issued'),
+                       'updated': ('updated', 'modified', 'lastbuilddate', 'dc_date', 'dcterms_modified'),
+                       'language': ('language', 'dc_language'),
+                       'summary': ('summary', 'description', 'dc_description', 'abstract', 'itunes_summary'),
+                       'content': ('content', 'content_encoded', 'body', 'xhtml_body', 'fullitem'),
+                       'author': ('author', 'dc_author', 'dc_creator', 'itunes_author'),
+                       'tags': ('category', 'dc_subject', 'keywords', 'itunes_category', 'media_category'),
+                       }
+
+# Elements that hold the feed and its entries; these are always parsed.
+_PROJECTION_CONTAINERS = set(['rss', 'rdf_rdf', 'channel', 'feed', 'item', 'entry'])
+
+def _projection_elements(fields):
+    '''Return the set of elements to parse for the fields of parse(fields=...),
+    or None to parse every element.'''
+    if fields is None:
+        return None
+    elements = set()
+    for field in fields:
+        elements.update(PROJECTION_ELEMENTS.get(field, (field,)))
+    return elements
+
 class FeedParserDict(dict):
     keymap = {'channel': 'feed',
               'items': 'entries',
@@ -402,6 +480,59 @@ class FeedParserDict(dict):
     def __hash__(self):
         return id(self)
 
+class FeedParserEntry(object):
+    '''A compact record of an entry, returned in place of its FeedParserDict
+    by parse(..., compact=True).
+
+    Each name in FeedParserEntry.fields is a slot holding the value the
+    FeedParserDict had under that key.  Fields the entry doesn't have are
+    left unset, so reading one raises AttributeError and hasattr() works as
+    it does on a FeedParserDict.  Only these canonical keys are kept: the
+    FeedParserDict aliases (e.g. 'guid' for 'id', 'date' for 'updated') and
+    every other key are not available on the record.  todict() turns a
+    record back into a FeedParserDict with the same keys.
+    '''
+    fields = ('id', 'link', 'links', 'title', 'summary', 'author', 'tags',
+              'published', 'published_parsed', 'updated', 'updated_parsed')
+    __slots__ = fields
+
+    def __init__(self, entry=None):
+        if entry:
+            for field in self.fields:
+                if dict.__contains__(entry, field):
+                    setattr(self, field, dict.__getitem__(entry, field))
+
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.fields and hasattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def todict(self):
+        '''
+        :return: A :class:`FeedParserDict`.
+        '''
+        return FeedParserDict((field, getattr(self, field)) for field in self.fields if hasattr(self, field))
+
+    def __repr__(self):
+        return 'FeedParserEntry(%r)' % (dict(self.todict()),)
+
+def _compact_entries(entries):
+    # convert the entries that are still FeedParserDicts, e.g. one whose
+    # closing tag the parser never saw
+    return [isinstance(entry, FeedParserDict) and FeedParserEntry(entry) or entry for entry in entries]
+
 _cp1252 = {
     128: chr(8364), # euro sign
     130: chr(8218), # single low-9 quotation mark
@@ -445,6 +576,15 @@ def _urljoin(base, uri):
         return uri.decode('utf-8', 'ignore')
     return uri
 
+# Patterns used by _FeedParserMixin for every element of that kind, compiled
+# once here rather than looked up in re's cache each time
+_link_entity_re = re.compile('&([A-Za-z0-9_]+);')
+_html_end_tag_re = re.compile(r'</(\w+)>')
+_html_reference_re = re.compile(r'&#?\w+;')
+_html_tag_name_re = re.compile(r'</?(\w+)')
+_html_entity_re = re.compile(r'&(\w+);')
+_email_re = re.compile(r'''(([a-zA-Z0-9\_\-\.\+]+)@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.)|(([a-zA-Z0-9\-]+\.)+))([a-zA-Z]{2,4}|[0-9]{1,3})(\]?))(\?subject=\S+)?''')
+
 class _FeedParserMixin:
     namespaces = {
         '': '',
@@ -563,6 +703,27 @@ class _FeedParserMixin:
         # None -> True -> False. psc_chapter elements will only be
         # captured while it is True.
         self.psc_chapters_flag = None
+        # called with each entry as soon as its closing tag has been parsed
+        self.entry_callback = None
+        # how many entries have been passed to entry_callback
+        self.entries_reported = 0
+        # stop once this many entries have been parsed, or at the first entry
+        # dated before this (year, month, day, hour, minute, second) in UTC
+        self.max_entries = None
+        self.since = None
+        # index into _date_formats of the shape of the last date parsed
+        self.date_format = None
+        # turn each entry into a FeedParserEntry once it has been parsed
+        self.compact = 0
+        # elements to parse (see _projection_elements), or None for all of
+        # them; skipdepth counts the open elements being skipped (whose tags
+        # the loose parser keeps in skiptags), and projecteddepth is the
+        # depth of the projected element projectedtag being parsed
+        self.projection = None
+        self.skipdepth = 0
+        self.skiptags = []
+        self.projecteddepth = 0
+        self.projectedtag = None
         if baselang:
             self.feeddata['language'] = baselang.replace('_','-')
 
@@ -587,7 +748,31 @@ class _FeedParserMixin:
                 v = v.decode('utf-8')
         return (k, v)
 
+    def _isVoidTag(self, tag):
+        # the loose parser reports html void elements like <br> and <img>
+        # as start tags, with an end tag only if the document has one
+        return isinstance(self, _LooseFeedParser) and \
+            tag in _BaseHTMLProcessor.elements_no_end_tag
+
     def unknown_starttag(self, tag, attrs):
+        # skip elements outside of the projection, along with their children
+        # (which only the loose parser passes on here)
+        if self.skipdepth:
+            if not self._isVoidTag(tag):
+                self.skiptags.append(tag)
+                self.skipdepth += 1
+            return
+        # void tags may or may not have an end tag in loose mode, so they are
+        # parsed like containers, with their children projected one by one
+        if self.projection is not None and not self.projecteddepth and not self._isVoidTag(tag):
+            element = self._projectionKey(tag)
+            if element not in _PROJECTION_CONTAINERS:
+                if element not in self.projection:
+                    self._skipElement(tag, element)
+                    return
+                self.projecteddepth = self.depth + 1
+                self.projectedtag = tag
+
         # increment depth counter
         self.depth += 1
 
@@ -676,6 +861,22 @@ class _FeedParserMixin:
                 context[unknown_tag] = attrsD
 
     def unknown_endtag(self, tag):
+        if self.skipdepth:
+            # an end tag closes the innermost skipped element of that name,
+            # along with any children the loose parser's html left open
+            if tag in self.skiptags:
+                del self.skiptags[len(self.skiptags) - self.skiptags[::-1].index(tag) - 1:]
+            elif self._projectionKey(tag) in _PROJECTION_CONTAINERS:
+                # the end of an entry or the feed ends a skipped element
+                # left open; go on to handle it
+                del self.skiptags[:]
+                self.skipdepth = 0
+            elif not self._isVoidTag(tag):
+                self.skiptags.pop()
+            if self.skipdepth:
+                self.skipdepth = len(self.skiptags)
+                return
+
         # match namespaces
         if tag.find(':') != -1:
             prefix, suffix = tag.split(':', 1)
@@ -717,11 +918,41 @@ class _FeedParserMixin:
             if self.langstack: # and (self.langstack[-1] is not None):
                 self.lang = self.langstack[-1]
 
+        # in loose mode, a void tag in the projected element leaves depth
+        # one too high, so its end tag ends it too
+        if self.depth == self.projecteddepth or tag == self.projectedtag:
+            self.projecteddepth = 0
+            self.projectedtag = None
         self.depth -= 1
 
+    def _skipElement(self, tag, element):
+        self.skipdepth = 1
+        self.skiptags = [tag]
+        # reset the state that starting the element resets in a full parse
+        # (see _start_source and unknown_starttag), so that the elements
+        # after it are read the same way
+        if element in ('source', 'image', 'textinput'):
+            self.title_depth = -1
+        if element == tag.split(':')[-1]:
+            if tag not in ('title', 'link', 'description', 'name'):
+                self.intextinput = 0
+            if tag not in ('title', 'link', 'description', 'url', 'href', 'width', 'height'):
+                self.inimage = 0
+
+    def _projectionKey(self, tag):
+        # the element name that unknown_starttag dispatches on, e.g. 'dc_title'
+        if tag.find(':') != -1:
+            prefix, suffix = tag.split(':', 1)
+        else:
+            prefix, suffix = '', tag
+        prefix = self.namespacemap.get(prefix, prefix)
+        if prefix:
+            return prefix + '_' + suffix
+        return suffix
+
     def handle_charref(self, ref):
         # called for each character reference, e.g. for '&#160;', ref will be '160'
-        if not self.elementstack:
+        if not self.elementstack or self.skipdepth:
             return
         ref = ref.lower()
         if ref in ('34', '38', '39', '60', '62', 'x22', 'x26', 'x27', 'x3c', 'x3e'):
@@ -731,12 +962,16 @@ class _FeedParserMixin:
                 c = int(ref[1:], 16)
             else:
                 c = int(ref)
-            text = chr(c).encode('utf-8')
+            try:
+                text = chr(c).encode('utf-8')
+            except (ValueError, OverflowError, UnicodeEncodeError):
+                # not a character, e.g. &#x110000; or a lone surrogate
+                text = '\ufffd'.encode('utf-8')
         self.elementstack[-1][2].append(text)
 
     def handle_entityref(self, ref):
         # called for each entity reference, e.g. for '&copy;', ref will be 'copy'
-        if not self.elementstack:
+        if not self.elementstack or self.skipdepth:
             return
         if ref in ('lt', 'gt', 'quot', 'amp', 'apos'):
             text = '&%s;' % ref
@@ -756,7 +991,7 @@ class _FeedParserMixin:
     def handle_data(self, text, escape=1):
         # called for each block of plain text, i.e. outside of any tag and
         # not containing any character or entity references
-        if not self.elementstack:
+        if not self.elementstack or self.skipdepth:
             return
         if escape and self.contentparams.get('type') == 'application/xhtml+xml':
             text = _xmlescape(text)
@@ -840,6 +1075,11 @@ class _FeedParserMixin:
 
         element, expectingText, pieces = self.elementstack.pop()
 
+        # Ensure each piece is a str for Python 3
+        for (i, v) in enumerate(pieces):
+            if not isinstance(v, str):
+                pieces[i] = v.decode('utf-8')
+
         if self.version == 'atom10' and self.contentparams.get('type', 'text') == 'application/xhtml+xml':
             # remove enclosing child element, but only if it is a <div> and
             # only if all the remaining content is nested underneath it.
@@ -861,11 +1101,6 @@ class _FeedParserMixin:
                 else:
                     pieces = pieces[1:-1]
 
-        # Ensure each piece is a str for Python 3
-        for (i, v) in enumerate(pieces):
-            if not isinstance(v, str):
-                pieces[i] = v.decode('utf-8')
-
         output = ''.join(pieces)
         if stripWhitespace:
             output = output.strip()
@@ -883,7 +1118,10 @@ class _FeedParserMixin:
             except TypeError:
                 # In Python 3, base64 takes and outputs bytes, not str
                 # This may not be the most correct way to accomplish this
-                output = _base64decode(output.encode('utf-8')).decode('utf-8')
+                try:
+                    output = _base64decode(output.encode('utf-8')).decode('utf-8')
+                except (binascii.Error, binascii.Incomplete, UnicodeDecodeError):
+                    pass
 
         # resolve relative URIs
         if (element in self.can_be_relative_uri) and output:
@@ -957,10 +1195,10 @@ class _FeedParserMixin:
                     # converted from `?a=1&b=2` to `?a=1&b;=2` as if they're
                     # unhandled character references. fix this special case.
                     output = output.replace('&amp;', '&')
-                    output = re.sub("&([A-Za-z0-9_]+);", "&\g<1>", output)
+                    output = _link_entity_re.sub(r'&\1', output)
                     self.entries[-1][element] = output
                     if output:
-                        self.entries[-1]['links'][-1]['href'] = output
+                        self.entries[-1].setdefault('links', [FeedParserDict()])[-1]['href'] = output
             else:
                 if element == 'description':
                     element = 'summary'
@@ -979,9 +1217,9 @@ class _FeedParserMixin:
             context[element] = output
             if element == 'link':
                 # fix query variables; see above for the explanation
-                output = re.sub("&([A-Za-z0-9_]+);", "&\g<1>", output)
+                output = _link_entity_re.sub(r'&\1', output)
                 context[element] = output
-                context['links'][-1]['href'] = output
+                context.setdefault('links', [FeedParserDict()])[-1]['href'] = output
             elif self.incontent:
                 contentparams = copy.deepcopy(self.contentparams)
                 contentparams['value'] = output
@@ -1012,15 +1250,15 @@ class _FeedParserMixin:
     @staticmethod
     def lookslikehtml(s):
         # must have a close tag or an entity reference to qualify
-        if not (re.search(r'</(\w+)>',s) or re.search("&#?\w+;",s)):
+        if not (_html_end_tag_re.search(s) or _html_reference_re.search(s)):
             return
 
         # all tags must be in a restricted subset of valid HTML tags
-        if [t for t in re.findall(r'</?(\w+)',s) if t.lower() not in _HTMLSanitizer.acceptable_elements]:
+        if [t for t in _html_tag_name_re.findall(s) if t.lower() not in _HTMLSanitizer.acceptable_elements]:
             return
 
         # all entities must have been defined as valid HTML entities
-        if [e for e in re.findall(r'&(\w+);', s) if e not in list(entitydefs.keys())]:
+        if [e for e in _html_entity_re.findall(s) if e not in entitydefs]:
             return
 
         return 1
@@ -1271,7 +1509,7 @@ class _FeedParserMixin:
             context = self.sourcedata
         elif self.inimage and 'image' in self.feeddata:
             context = self.feeddata['image']
-        elif self.intextinput:
+        elif self.intextinput and 'textinput' in self.feeddata:
             context = self.feeddata['textinput']
         elif self.inentry:
             context = self.entries[-1]
@@ -1308,7 +1546,7 @@ class _FeedParserMixin:
             author, email = context.get(key), None
             if not author:
                 return
-            emailmatch = re.search(r'''(([a-zA-Z0-9\_\-\.\+]+)@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.)|(([a-zA-Z0-9\-]+\.)+))([a-zA-Z]{2,4}|[0-9]{1,3})(\]?))(\?subject=\S+)?''', author)
+            emailmatch = _email_re.search(author)
             if emailmatch:
                 email = emailmatch.group(0)
                 # probably a better way to do the following, but it passes all the tests
@@ -1350,6 +1588,8 @@ class _FeedParserMixin:
     _end_copyright = _end_rights
 
     def _start_item(self, attrsD):
+        if self.max_entries is not None and len(self.entries) >= self.max_entries:
+            raise _StopParsing()
         self.entries.append(FeedParserDict())
         self.push('item', 0)
         self.inentry = 1
@@ -1366,6 +1606,16 @@ class _FeedParserMixin:
     def _end_item(self):
         self.pop('item')
         self.inentry = 0
+        if self.since is not None and self.entries:
+            date = self.entries[-1].get('published_parsed') or self.entries[-1].get('updated_parsed')
+            if date and tuple(date[:6]) < self.since:
+                del self.entries[-1]
+                raise _StopParsing()
+        if self.compact and self.entries and isinstance(self.entries[-1], FeedParserDict):
+            self.entries[-1] = FeedParserEntry(self.entries[-1])
+        if self.entry_callback is not None and len(self.entries) > self.entries_reported:
+            self.entries_reported = len(self.entries)
+            self.entry_callback(self.entries[-1])
     _end_entry = _end_item
 
     def _start_dc_language(self, attrsD):
@@ -1385,6 +1635,12 @@ class _FeedParserMixin:
         self._sync_author_detail('publisher')
     _end_webmaster = _end_dc_publisher
 
+    def _parseDate(self, dateString):
+        # a feed nearly always writes all of its dates the same way, so the
+        # shape of the last one is checked first
+        date9tuple, self.date_format = _parse_date_hinted(dateString, self.date_format)
+        return date9tuple
+
     def _start_dcterms_valid(self, attrsD):
         self.push('validity', 1)
 
@@ -1394,10 +1650,10 @@ class _FeedParserMixin:
                 key, value = validity_detail.split('=', 1)
                 if key == 'start':
                     self._save('validity_start', value, overwrite=True)
-                    self._save('validity_start_parsed', _parse_date(value), overwrite=True)
+                    self._save('validity_start_parsed', self._parseDate(value), overwrite=True)
                 elif key == 'end':
                     self._save('validity_end', value, overwrite=True)
-                    self._save('validity_end_parsed', _parse_date(value), overwrite=True)
+                    self._save('validity_end_parsed', self._parseDate(value), overwrite=True)
 
     def _start_published(self, attrsD):
         self.push('published', 1)
@@ -1407,7 +1663,7 @@ class _FeedParserMixin:
 
     def _end_published(self):
         value = self.pop('published')
-        self._save('published_parsed', _parse_date(value), overwrite=True)
+        self._save('published_parsed', self._parseDate(value), overwrite=True)
     _end_dcterms_issued = _end_published
     _end_issued = _end_published
     _end_pubdate = _end_published
@@ -1421,7 +1677,7 @@ class _FeedParserMixin:
 
     def _end_updated(self):
         value = self.pop('updated')
-        parsed_value = _parse_date(value)
+        parsed_value = self._parseDate(value)
         self._save('updated_parsed', parsed_value, overwrite=True)
     _end_modified = _end_updated
     _end_dcterms_modified = _end_updated
@@ -1434,14 +1690,14 @@ class _FeedParserMixin:
 
     def _end_created(self):
         value = self.pop('created')
-        self._save('created_parsed', _parse_date(value), overwrite=True)
+        self._save('created_parsed', self._parseDate(value), overwrite=True)
     _end_dcterms_created = _end_created
 
     def _start_expirationdate(self, attrsD):
         self.push('expired', 1)
 
     def _end_expirationdate(self):
-        self._save('expired_parsed', _parse_date(self.pop('expired')), overwrite=True)
+        self._save('expired_parsed', self._parseDate(self.pop('expired')), overwrite=True)
 
     # geospatial location, or "where", from georss.org
 
@@ -1640,7 +1896,7 @@ class _FeedParserMixin:
         if not value:
             return
         context = self._getContext()
-        tags = context['tags']
+        tags = context.setdefault('tags', [])
         if value and len(tags) and not tags[-1]['term']:
             tags[-1]['term'] = value
         else:
@@ -1983,6 +2239,11 @@ if _XML_AVAILABLE:
                 self.decls['xmlns:' + prefix] = uri
 
         def startElementNS(self, name, qname, attrs):
+            if self.skipdepth:
+                # inside an element outside of the projection
+                self.skipdepth += 1
+                self.decls = {}
+                return
             namespace, localname = name
             lowernamespace = str(namespace or '').lower()
             if lowernamespace.find('backend.userland.com/rss') != -1:
@@ -2031,9 +2292,13 @@ if _XML_AVAILABLE:
             self.unknown_starttag(localname, list(attrsD.items()))
 
         def characters(self, text):
-            self.handle_data(text)
+            if not self.skipdepth:
+                self.handle_data(text)
 
         def endElementNS(self, name, qname):
+            if self.skipdepth:
+                self.skipdepth -= 1
+                return
             namespace, localname = name
             lowernamespace = str(namespace or '').lower()
             if qname and qname.find(':') > 0:
@@ -2065,6 +2330,8 @@ if _XML_AVAILABLE:
 class _BaseHTMLProcessor(sgmllib.SGMLParser):
     special = re.compile('''[<>'"]''')
     bare_ampersand = re.compile("&(?!#\d+;|#x[0-9a-fA-F]+;|\w+;)")
+    bogus_declaration = re.compile(r'<!((?!DOCTYPE|--|\[))', re.IGNORECASE)
+    self_closing_tag = re.compile(r'<([^<>\s]+?)\s*/>')
     elements_no_end_tag = set([
       'area', 'base', 'basefont', 'br', 'col', 'command', 'embed', 'frame',
       'hr', 'img', 'input', 'isindex', 'keygen', 'link', 'meta', 'param',
@@ -2108,8 +2375,8 @@ class _BaseHTMLProcessor(sgmllib.SGMLParser):
         return j
 
     def feed(self, data):
-        data = re.compile(r'<!((?!DOCTYPE|--|\[))', re.IGNORECASE).sub(r'&lt;!\1', data)
-        data = re.sub(r'<([^<>\s]+?)\s*/>', self._shorttag_replace, data)
+        data = self.bogus_declaration.sub(r'&lt;!\1', data)
+        data = self.self_closing_tag.sub(self._shorttag_replace, data)
         data = data.replace('&#39;', "'")
         data = data.replace('&#34;', '"')
         try:
@@ -2325,13 +2592,18 @@ class _RelativeURIResolver(_BaseHTMLProcessor):
         _BaseHTMLProcessor.unknown_starttag(self, tag, attrs)
 
 def _resolveRelativeURIs(htmlSource, baseURI, encoding, _type):
-    if not _SGML_AVAILABLE:
+    if not _SGML_AVAILABLE or not _hasMarkup(htmlSource):
         return htmlSource
 
     p = _RelativeURIResolver(baseURI, encoding, _type)
     p.feed(htmlSource)
     return p.output()
 
+def _hasMarkup(htmlSource):
+    # text without tags or references passes through _BaseHTMLProcessor
+    # unchanged, so there is no need to tokenize it
+    return '<' in htmlSource or '&' in htmlSource
+
 def _makeSafeAbsoluteURI(base, rel=None):
     # bail if ACCEPTABLE_URI_SCHEMES is empty
     if not ACCEPTABLE_URI_SCHEMES:
@@ -2414,6 +2686,15 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
     valid_css_values = re.compile('^(#[0-9a-f]+|rgb\(\d+%?,\d*%?,?\d*%?\)?|' +
       '\d{0,2}\.?\d{0,2}(cm|em|ex|in|mm|pc|pt|px|%|,|\))?)$')
 
+    # used by sanitize_style
+    css_url = re.compile('url\s*\(\s*[^\s)]+?\s*\)\s*')
+    css_gauntlet = re.compile("""^([:,;#%.\sa-zA-Z0-9!]|\w-\w|'[\s\w]+'|"[\s\w]+"|\([\d,\s]+\))*$""")
+    css_declaration = re.compile("\s*[-\w]+\s*:\s*[^:;]*;?")
+    css_property = re.compile("([-\w]+)\s*:\s*([^:;]*)")
+
+    # used by parse_comment to skip past an unclosed comment
+    comment_end = re.compile(r'--[^>]*>')
+
     mathml_elements = set([
         'annotation',
         'annotation-xml',
@@ -2703,17 +2984,17 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
 
     def sanitize_style(self, style):
         # disallow urls
-        style=re.compile('url\s*\(\s*[^\s)]+?\s*\)\s*').sub(' ',style)
+        style=self.css_url.sub(' ',style)
 
         # gauntlet
-        if not re.match("""^([:,;#%.\sa-zA-Z0-9!]|\w-\w|'[\s\w]+'|"[\s\w]+"|\([\d,\s]+\))*$""", style):
+        if not self.css_gauntlet.match(style):
             return ''
         # This replaced a regexp that used re.match and was prone to pathological back-tracking.
-        if re.sub("\s*[-\w]+\s*:\s*[^:;]*;?", '', style).strip():
+        if self.css_declaration.sub('', style).strip():
             return ''
 
         clean = []
-        for prop,value in re.findall("([-\w]+)\s*:\s*([^:;]*)",style):
+        for prop,value in self.css_property.findall(style):
             if not value:
                 continue
             if prop.lower() in self.acceptable_css_properties:
@@ -2736,7 +3017,7 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
             return ret
         # if ret == -1, this may be a malicious attempt to circumvent
         # sanitization, or a page-destroying unclosed comment
-        match = re.compile(r'--[^>]*>').search(self.rawdata, i+4)
+        match = self.comment_end.search(self.rawdata, i+4)
         if match:
             return match.end()
         # unclosed comment; deliberately fail to handle_data()
@@ -2746,6 +3027,8 @@ class _HTMLSanitizer(_BaseHTMLProcessor):
 def _sanitizeHTML(htmlSource, encoding, _type):
     if not _SGML_AVAILABLE:
         return htmlSource
+    if not _hasMarkup(htmlSource):
+        return htmlSource.strip().replace('\r\n', '\n')
     p = _HTMLSanitizer(encoding, _type)
     htmlSource = htmlSource.replace('<![CDATA[', '&lt;![CDATA[')
     p.feed(htmlSource)
@@ -2796,7 +3079,138 @@ class _FeedURLHandler(urllib.request.HTTPDigestAuthHandler, urllib.request.HTTPR
         self.reset_retry_count()
         return retry
 
-def _open_resource(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers):
+class _PooledHTTPResponse(http.client.HTTPResponse):
+    # set by HTTPConnectionPool; called with whether the connection can be
+    # reused once the response is closed
+    _release = None
+
+    def close(self):
+        # the connection can only carry another request if this response
+        # has been read to the end
+        reusable = (self.fp is None or (self.length == 0 and not self.chunked)) and not self.will_close
+        try:
+            http.client.HTTPResponse.close(self)
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release(reusable)
+
+class _PooledHTTPHandler(urllib.request.HTTPHandler):
+    def __init__(self, pool):
+        urllib.request.HTTPHandler.__init__(self)
+        self.pool = pool
+
+    def http_open(self, req):
+        return self.pool._open_connection(http.client.HTTPConnection, req)
+
+class _PooledHTTPSHandler(urllib.request.HTTPSHandler):
+    def __init__(self, pool):
+        urllib.request.HTTPSHandler.__init__(self, context=pool.context)
+        self.pool = pool
+
+    def https_open(self, req):
+        return self.pool._open_connection(http.client.HTTPSConnection, req, context=self._context)
+
+class HTTPConnectionPool(object):
+    '''Keep-alive HTTP and HTTPS connections shared between calls to parse().
+
+    Pass an instance as parse(..., transport=pool) to reuse connections (and
+    with them the TCP and TLS handshakes) for feeds on the same host.  Requests
+    still go through the usual urllib2 handlers, so redirects, authentication,
+    gzip/deflate and ETag/Last-Modified work as without a pool.  A connection
+    returns to the pool once its response has been read to the end and
+    closed, which parse() always does.  The pool is safe to share between
+    threads.
+
+    Any object with an open(request, handlers) method that returns a
+    file-like urllib2 response can be used as a transport.
+    '''
+
+    def __init__(self, max_idle_per_host=4, context=None):
+        self.max_idle_per_host = max_idle_per_host
+        self.context = context # ssl.SSLContext for https connections
+        self._idle = {} # (connection class, host, tunnel host) -> [connection]
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def open(self, request, handlers):
+        opener = urllib.request.build_opener(*tuple(handlers + [_FeedURLHandler(), _PooledHTTPHandler(self), _PooledHTTPSHandler(self)]))
+        opener.addheaders = [] # RMK - must clear so we only send our custom User-Agent
+        try:
+            return opener.open(request)
+        finally:
+            opener.close()
+
+    def close(self):
+        '''Close the idle connections; connections in use are closed as they
+        are released.'''
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _checkout(self, key):
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop()
+        return None
+
+    def _checkin(self, key, connection, reusable):
+        if reusable:
+            with self._lock:
+                connections = self._idle.setdefault(key, [])
+                if not self._closed and len(connections) < self.max_idle_per_host:
+                    connections.append(connection)
+                    return
+        connection.close()
+
+    def _open_connection(self, http_class, req, **http_conn_args):
+        # urllib2's AbstractHTTPHandler.do_open, minus the "Connection: close"
+        host = req.host
+        if not host:
+            raise urllib.error.URLError('no host given')
+        headers = dict(req.unredirected_hdrs)
+        headers.update((k, v) for k, v in list(req.headers.items()) if k not in headers)
+        headers = dict((name.title(), val) for name, val in list(headers.items()))
+        tunnel_headers = {}
+        if req._tunnel_host and 'Proxy-Authorization' in headers:
+            # Proxy-Authorization should not be sent to origin server.
+            tunnel_headers['Proxy-Authorization'] = headers.pop('Proxy-Authorization')
+        key = (http_class, host, req._tunnel_host)
+
+        while True:
+            connection = self._checkout(key)
+            reused = connection is not None
+            if not reused:
+                connection = http_class(host, timeout=req.timeout, **http_conn_args)
+                connection.response_class = _PooledHTTPResponse
+                if req._tunnel_host:
+                    connection.set_tunnel(req._tunnel_host, headers=tunnel_headers)
+            try:
+                try:
+                    connection.request(req.get_method(), req.selector, req.data, headers,
+                                       encode_chunked=req.has_header('Transfer-encoding'))
+                except OSError as e: # timeout error
+                    raise urllib.error.URLError(e)
+                r = connection.getresponse()
+            except Exception:
+                connection.close()
+                if reused:
+                    # the server may have dropped the idle connection, so
+                    # try again on another one
+                    continue
+                raise
+            break
+
+        r._release = lambda reusable: self._checkin(key, connection, reusable)
+        r.url = req.get_full_url()
+        r.msg = r.reason
+        return r
+
+def _open_resource(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, transport=None):
     """URL, filename, or string --> stream
 
     This function lets you define parsers that take any input source
@@ -2827,6 +3241,9 @@ def _open_resource(url_file_stream_or_string, etag, modified, agent, referrer, h
     if request_headers is supplied it is a dictionary of HTTP request headers
     that will override the values generated by FeedParser.
 
+    If transport is supplied, it is used to open URLs instead of a new
+    urllib2 opener (see HTTPConnectionPool).
+
     :return: A :class:`StringIO.StringIO` or :class:`io.BytesIO`.
     """
 
@@ -2859,6 +3276,8 @@ def _open_resource(url_file_stream_or_string, etag, modified, agent, referrer, h
 
         # try to open with urllib2 (to use optional headers)
         request = _build_urllib2_request(url_file_stream_or_string, agent, etag, modified, referrer, auth, request_headers)
+        if transport is not None:
+            return transport.open(request, handlers)
         opener = urllib.request.build_opener(*tuple(handlers + [_FeedURLHandler()]))
         opener.addheaders = [] # RMK - must clear so we only send our custom User-Agent
         try:
@@ -2946,10 +3365,9 @@ def _build_urllib2_request(url, agent, etag, modified, referrer, auth, request_h
     request.add_header('A-IM', 'feed') # RFC 3229 support
     return request
 
+_psc_chapter_start_re = re.compile(r'^((\d{2}):)?(\d{2}):(\d{2})(\.(\d{3}))?$')
 def _parse_psc_chapter_start(start):
-    FORMAT = r'^((\d{2}):)?(\d{2}):(\d{2})(\.(\d{3}))?$'
-
-    m = re.compile(FORMAT).match(start)
+    m = _psc_chapter_start_re.match(start)
     if m is None:
         return None
 
@@ -2961,6 +3379,11 @@ _date_handlers = []
 def registerDateHandler(func):
     '''Register a date handler function (takes string, returns 9-tuple date in GMT)'''
     _date_handlers.insert(0, func)
+    _date_memo.clear()
+
+# Date strings already parsed, mapped to (9-tuple, index into _date_formats)
+_date_memo = {}
+_DATE_MEMO_SIZE = 10000
 
 # ISO-8601 date parsing routines written by Fazal Majid.
 # The ISO 8601 standard is very convoluted and irregular - a full ISO 8601
@@ -3425,13 +3848,11 @@ def _parse_date_asctime(dt):
     ]))
 registerDateHandler(_parse_date_asctime)
 
+# Fri, 2006/09/15 08:19:53 EDT
+_perforce_date_re = re.compile(r'(\w{,3}), (\d{,4})/(\d{,2})/(\d{2}) (\d{,2}):(\d{2}):(\d{2}) (\w{,3})')
 def _parse_date_perforce(aDateString):
     """parse a date in yyyy/mm/dd hh:mm:ss TTT format"""
-    # Fri, 2006/09/15 08:19:53 EDT
-    _my_date_pattern = re.compile( \
-        r'(\w{,3}), (\d{,4})/(\d{,2})/(\d{2}) (\d{,2}):(\d{2}):(\d{2}) (\w{,3})')
-
-    m = _my_date_pattern.search(aDateString)
+    m = _perforce_date_re.search(aDateString)
     if m is None:
         return None
     dow, year, month, day, hour, minute, second, tz = m.groups()
@@ -3442,21 +3863,78 @@ def _parse_date_perforce(aDateString):
         return time.gmtime(rfc822.mktime_tz(tm))
 registerDateHandler(_parse_date_perforce)
 
+# Date string shapes that, of the built-in handlers, only the one paired with
+# them can parse; every handler ahead of it in _date_handlers turns such a
+# string down.  A string of one of these shapes is handed straight to its
+# handler, and only goes through the whole list if that handler fails too.
+_date_formats = [
+    # RFC 822: Mon, 06 Sep 2021 16:45:00 +0000
+    (re.compile(r'(?:[a-zA-Z]{3},\s+)?\d{1,2}\s+[a-zA-Z]{3}\s+[1-9]\d{3}\s+\d{1,2}:\d{2}(?::\d{2})?\s+(?:[+-]\d{4}|[a-zA-Z]{1,5})$').match, _parse_date_rfc822),
+    # W3DTF: 2021-09-06T16:45:00Z
+    (re.compile(r'\d{4}-\d{2}-\d{2}(?:[Tt ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:[Zz]|[+-]\d{2}:\d{2})?)?$').match, _parse_date_w3dtf),
+    # asctime: Mon Sep  6 16:45:00 2021
+    (re.compile(r'[a-zA-Z]{3}\s+[a-zA-Z]{3}\s+\d{1,2}\s+\d{1,2}:\d{2}:\d{2}(?:\s+[+-]\d{4})?\s+\d{4}$').match, _parse_date_asctime),
+]
+_builtin_date_handler_count = len(_date_handlers)
+
 def _parse_date(dateString):
     '''Parses a variety of date formats into a 9-tuple in GMT'''
+    return _parse_date_hinted(dateString)[0]
+
+def _parse_date_hinted(dateString, date_format=None):
+    '''Parse dateString like _parse_date, checking the _date_formats shape
+    at index date_format first.
+
+    :return: The 9-tuple (or None) and the index of the shape dateString has
+             (or date_format if it has none of them).
+    '''
     if not dateString:
+        return None, date_format
+    try:
+        date9tuple, index = _date_memo[dateString]
+    except KeyError:
+        date9tuple, index = _parse_date_sniffed(dateString, date_format)
+        if len(_date_memo) >= _DATE_MEMO_SIZE:
+            _date_memo.clear()
+        _date_memo[dateString] = date9tuple, index
+    if index is None:
+        index = date_format
+    return date9tuple, index
+
+def _parse_date_sniffed(dateString, date_format):
+    # _parse_date_hinted without the memo; the index is None when dateString
+    # has none of the _date_formats shapes
+    result = None, None
+    # handlers registered since import come first and may accept anything
+    if len(_date_handlers) == _builtin_date_handler_count:
+        indexes = list(range(len(_date_formats)))
+        if date_format is not None:
+            indexes.remove(date_format)
+            indexes.insert(0, date_format)
+        for index in indexes:
+            match, handler = _date_formats[index]
+            if match(dateString):
+                result = _call_date_handler(handler, dateString), index
+                break
+    if result[0] is None:
+        for handler in _date_handlers:
+            date9tuple = _call_date_handler(handler, dateString)
+            if date9tuple is not None:
+                result = date9tuple, result[1]
+                break
+    return result
+
+def _call_date_handler(handler, dateString):
+    # the handler's 9-tuple, or None if it can't parse dateString
+    try:
+        date9tuple = handler(dateString)
+    except (KeyError, OverflowError, ValueError):
         return None
-    for handler in _date_handlers:
-        try:
-            date9tuple = handler(dateString)
-        except (KeyError, OverflowError, ValueError):
-            continue
-        if not date9tuple:
-            continue
-        if len(date9tuple) != 9:
-            continue
-        return date9tuple
-    return None
+    if not date9tuple:
+        return None
+    if len(date9tuple) != 9:
+        return None
+    return date9tuple
 
 # Each marker represents some of the characters of the opening XML
 # processing instruction ('<?xm') in the specified encoding.
@@ -3523,6 +4001,110 @@ def convert_to_utf8(http_headers, data):
     # you should definitely install it if you can.
     # http://cjkpython.i18n.org/
 
+    data, bom_encoding, xml_encoding, rfc3023_encoding, error = _sniff_encoding(http_headers, data)
+
+    # Most documents are UTF-8 (or plain ASCII) and say so; if the XML
+    # parser would read them correctly as they are, skip decoding the whole
+    # document and encoding it again.
+    if bom_encoding in ('', 'utf-8') and _is_utf8_as_is(data, xml_encoding, rfc3023_encoding):
+        return data, rfc3023_encoding, error
+
+    # determine character encoding
+    known_encoding = 0
+    lazy_chardet_encoding = None
+    tried_encodings = []
+    if chardet:
+        def lazy_chardet_encoding():
+            return _chardet_encoding(data)
+    # try: HTTP encoding, declared XML encoding, encoding sniffed from BOM
+    for proposed_encoding in (rfc3023_encoding, xml_encoding, bom_encoding,
+                              lazy_chardet_encoding, 'utf-8', 'windows-1252', 'iso-8859-2'):
+        if callable(proposed_encoding):
+            proposed_encoding = proposed_encoding()
+        if not proposed_encoding:
+            continue
+        if proposed_encoding in tried_encodings:
+            continue
+        tried_encodings.append(proposed_encoding)
+        try:
+            data = data.decode(proposed_encoding)
+        except (UnicodeDecodeError, LookupError):
+            pass
+        else:
+            known_encoding = 1
+            data = _replace_xml_declaration(data).encode('utf-8')
+            break
+    # if still no luck, give up
+    if not known_encoding:
+        error = CharacterEncodingUnknown(
+            'document encoding unknown, I tried ' +
+            '%s, %s, utf-8, windows-1252, and iso-8859-2 but nothing worked' %
+            (rfc3023_encoding, xml_encoding))
+        rfc3023_encoding = ''
+    elif proposed_encoding != rfc3023_encoding:
+        error = CharacterEncodingOverride(
+            'document declared as %s, but parsed as %s' %
+            (rfc3023_encoding, proposed_encoding))
+        rfc3023_encoding = proposed_encoding
+
+    return data, rfc3023_encoding, error
+
+# Names of UTF-8 and of ASCII, which _is_utf8_as_is accepts as declared
+# encodings of ASCII documents.  A document with no encoding declaration is
+# read as UTF-8.  Expat reads non-ASCII data as UTF-8 only if it is declared
+# as 'utf-8' (or not at all); aliases such as 'utf8' are looked up as
+# single-byte encodings, so those documents are still converted.
+_UTF8_ENCODINGS = ('utf-8', 'utf8')
+_ASCII_ENCODINGS = ('us-ascii', 'ascii')
+
+def _is_utf8_as_is(data, xml_encoding, rfc3023_encoding):
+    '''Return True if data would decode as rfc3023_encoding and the XML
+    parser would read it in the same way without converting it, i.e. it is
+    valid UTF-8 (or ASCII), declared as such or not declared at all.'''
+    rfc3023_encoding = rfc3023_encoding.lower()
+    if rfc3023_encoding in _UTF8_ENCODINGS + _ASCII_ENCODINGS and \
+       xml_encoding in ('',) + _UTF8_ENCODINGS + _ASCII_ENCODINGS and data.isascii():
+        return True
+    if rfc3023_encoding not in _UTF8_ENCODINGS or xml_encoding not in ('', 'utf-8'):
+        return False
+    # decode a piece at a time, so that no decoded copy of the whole
+    # document is made just to throw it away
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    view = memoryview(data)
+    try:
+        for start in range(0, len(view), STREAMING_CHUNK_SIZE):
+            decoder.decode(view[start:start + STREAMING_CHUNK_SIZE])
+        decoder.decode(_s2bytes(''), True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def _chardet_encoding(data):
+    chardet_encoding = chardet.detect(data)['encoding']
+    if not chardet_encoding:
+        chardet_encoding = ''
+    if not isinstance(chardet_encoding, str):
+        chardet_encoding = str(chardet_encoding, 'ascii', 'ignore')
+    return chardet_encoding
+
+def _replace_xml_declaration(data):
+    '''Update the encoding in the opening XML processing instruction of the
+    decoded document data to utf-8, adding a declaration if there is none.'''
+    new_declaration = '''<?xml version='1.0' encoding='utf-8'?>'''
+    if RE_XML_DECLARATION.search(data):
+        return RE_XML_DECLARATION.sub(new_declaration, data)
+    return new_declaration + '\n' + data
+
+def _sniff_encoding(http_headers, data):
+    '''Work out the candidate encodings of a document, see convert_to_utf8.
+
+    Only the start of data is examined, so this also works on the first
+    chunk of a document that is still being read.
+
+    Returns (data, bom_encoding, xml_encoding, rfc3023_encoding, error),
+    where data has any byte order mark removed and error is a
+    NonXMLContentType exception or None.'''
+
     bom_encoding = ''
     xml_encoding = ''
     rfc3023_encoding = ''
@@ -3636,56 +4218,7 @@ def convert_to_utf8(http_headers, data):
             msg = 'no Content-type specified'
         error = NonXMLContentType(msg)
 
-    # determine character encoding
-    known_encoding = 0
-    lazy_chardet_encoding = None
-    tried_encodings = []
-    if chardet:
-        def lazy_chardet_encoding():
-            chardet_encoding = chardet.detect(data)['encoding']
-            if not chardet_encoding:
-                chardet_encoding = ''
-            if not isinstance(chardet_encoding, str):
-                chardet_encoding = str(chardet_encoding, 'ascii', 'ignore')
-            return chardet_encoding
-    # try: HTTP encoding, declared XML encoding, encoding sniffed from BOM
-    for proposed_encoding in (rfc3023_encoding, xml_encoding, bom_encoding,
-                              lazy_chardet_encoding, 'utf-8', 'windows-1252', 'iso-8859-2'):
-        if callable(proposed_encoding):
-            proposed_encoding = proposed_encoding()
-        if not proposed_encoding:
-            continue
-        if proposed_encoding in tried_encodings:
-            continue
-        tried_encodings.append(proposed_encoding)
-        try:
-            data = data.decode(proposed_encoding)
-        except (UnicodeDecodeError, LookupError):
-            pass
-        else:
-            known_encoding = 1
-            # Update the encoding in the opening XML processing instruction.
-            new_declaration = '''<?xml version='1.0' encoding='utf-8'?>'''
-            if RE_XML_DECLARATION.search(data):
-                data = RE_XML_DECLARATION.sub(new_declaration, data)
-            else:
-                data = new_declaration + '\n' + data
-            data = data.encode('utf-8')
-            break
-    # if still no luck, give up
-    if not known_encoding:
-        error = CharacterEncodingUnknown(
-            'document encoding unknown, I tried ' +
-            '%s, %s, utf-8, windows-1252, and iso-8859-2 but nothing worked' %
-            (rfc3023_encoding, xml_encoding))
-        rfc3023_encoding = ''
-    elif proposed_encoding != rfc3023_encoding:
-        error = CharacterEncodingOverride(
-            'document declared as %s, but parsed as %s' %
-            (rfc3023_encoding, proposed_encoding))
-        rfc3023_encoding = proposed_encoding
-
-    return data, rfc3023_encoding, error
+    return data, bom_encoding, xml_encoding, rfc3023_encoding, error
 
 # Match XML entity declarations.
 # Example: <!ENTITY copyright "(C)">
@@ -3703,6 +4236,9 @@ RE_DOCTYPE_PATTERN = re.compile(_s2bytes(r'^\s*<!DOCTYPE([^>]*?)>'), re.MULTILIN
 # Forbidden: explode1 "&explode2;&explode2;"
 RE_SAFE_ENTITY_PATTERN = re.compile(_s2bytes('\s+(\w+)\s+"(&#\w+;|[^&"]*)"'))
 
+# The start of the first element, which ends the document's prolog
+RE_ELEMENT_START = re.compile(_s2bytes('<\w'))
+
 def replace_doctype(data):
     '''Strips and replaces the DOCTYPE, returns (rss_version, stripped_data)
 
@@ -3712,7 +4248,7 @@ def replace_doctype(data):
 
     # Divide the document into two groups by finding the location
     # of the first element that doesn't begin with '<?' or '<!'.
-    start = re.search(_s2bytes('<\w'), data)
+    start = RE_ELEMENT_START.search(data)
     start = start and start.start() or -1
     head, data = data[:start+1], data[start+1:]
 
@@ -3814,14 +4350,87 @@ def _parse_georss_box(value, swap=True, dims=2):
 # end geospatial parsers
 
 
-def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, referrer=None, handlers=None, request_headers=None, response_headers=None):
+def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, referrer=None, handlers=None, request_headers=None, response_headers=None, streaming=False, entry_callback=None, fields=None, transport=None, compact=False, max_entries=None, since=None):
     '''Parse a feed from a URL, file, stream, or string.
 
     request_headers, if given, is a dict from http header name to value to add
     to the request; this overrides internally generated values.
 
+    transport, if given, opens URLs in place of a new urllib2 opener; pass an
+    HTTPConnectionPool to reuse connections across calls.
+
+    compact, if true, returns each entry as a FeedParserEntry holding only
+    the fields listed in FeedParserEntry.fields, instead of a FeedParserDict.
+    Each entry is converted as soon as it has been parsed, so entry_callback
+    receives the FeedParserEntry too.
+
+    streaming, if true, reads the document STREAMING_CHUNK_SIZE bytes at a
+    time and pushes each piece into an incremental SAX parser as it arrives,
+    instead of reading the whole document and converting full copies of it.
+    The character encoding is chosen from the start of the document; bytes
+    later in the document that are invalid in that encoding are replaced and
+    the feed is marked bozo.  As the document is not kept, a malformed one
+    can't be parsed again with the lenient parser; only what was parsed up
+    to the error is returned.
+
+    entry_callback, if given, is called with each entry as soon as the entry
+    has been parsed, before the rest of the document has been read.
+
+    fields, if given, is a list of the feed and entry fields that are needed,
+    e.g. ['title', 'link', 'published', 'language'] (see PROJECTION_ELEMENTS).
+    Elements that do not provide one of them are skipped as they are read,
+    along with everything inside them, so their text is never collected,
+    sanitized, or resolved.  Other fields may still be filled in as a side
+    effect, but should not be relied on.
+
+    max_entries, if given, ends the parse when the entry after the first
+    max_entries entries starts.  since, if given, is a date string, a datetime, or a UTC
+    9-tuple; the parse ends at the first entry published (or, failing that,
+    updated) before it, which is left out.  Entries without a date never
+    end the parse.  This assumes the feed lists its newest entries first.
+    Either way, anything after the last entry parsed, including feed
+    elements, is not read, and a streamed document is not downloaded any
+    further.
+
     :return: A :class:`FeedParserDict`.
     '''
+    since = _date_horizon(since)
+
+    # streaming needs an incremental XML parser
+    streaming = streaming and _XML_AVAILABLE
+    result, f, data, http_headers = _read_resource(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, response_headers, streaming, transport)
+    if data is None:
+        return result
+
+    if streaming:
+        baseuri, baselang = _base_uri_and_lang(result, http_headers)
+        try:
+            return _parse_stream(result, f, data, http_headers, baseuri, baselang, entry_callback, fields, compact, max_entries, since)
+        finally:
+            if hasattr(f, 'close'):
+                f.close()
+
+    return _parse_data(result, data, http_headers, entry_callback, fields, compact, max_entries, since)
+
+def _date_horizon(since):
+    '''Normalize parse(since=...) to a (year, month, day, hour, minute,
+    second) tuple in UTC, comparable with the leading items of
+    published_parsed, or None.'''
+    if isinstance(since, str):
+        since = _parse_date(since)
+    elif isinstance(since, datetime.datetime):
+        since = since.utctimetuple()
+    if not since:
+        return None
+    return tuple(since[:6])
+
+def _read_resource(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, response_headers, streaming, transport):
+    '''Open and read the document for parse(), without parsing it.
+
+    Returns (result, f, data, http_headers): the result so far, with the
+    HTTP headers, status and href filled in; the opened resource; the
+    decompressed document (or its first chunk, when streaming), or None if
+    there is nothing to parse; and the lowercased HTTP headers.'''
 
     if handlers is None:
         handlers = []
@@ -3837,8 +4446,11 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
     if not isinstance(handlers, list):
         handlers = [handlers]
     try:
-        f = _open_resource(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers)
-        data = f.read()
+        f = _open_resource(url_file_stream_or_string, etag, modified, agent, referrer, handlers, request_headers, transport)
+        if streaming:
+            data = f.read(STREAMING_CHUNK_SIZE)
+        else:
+            data = f.read()
     except Exception as e:
         result['bozo'] = 1
         result['bozo_exception'] = e
@@ -3860,7 +4472,8 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
         http_headers = {}
 
     # if feed is gzip-compressed, decompress it
-    if f and data and http_headers:
+    # (when streaming, this is done a chunk at a time by _iter_stream)
+    if f and data and http_headers and not streaming:
         if gzip and 'gzip' in http_headers.get('content-encoding', ''):
             try:
                 data = gzip.GzipFile(fileobj=_StringIO(data)).read()
@@ -3906,27 +4519,24 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
         result['status'] = 200
     if hasattr(f, 'status'):
         result['status'] = f.status
-    if hasattr(f, 'close'):
+    if hasattr(f, 'close') and not streaming:
         f.close()
 
     if data is None:
-        return result
+        return result, f, None, http_headers
 
     # Stop processing if the server sent HTTP 304 Not Modified.
     if getattr(f, 'code', 0) == 304:
+        if hasattr(f, 'close'):
+            f.close()
         result['version'] = ''
         result['debug_message'] = 'The feed has not changed since you last checked, ' + \
             'so the server sent no data.  This is a feature, not a bug!'
-        return result
-
-    data, result['encoding'], error = convert_to_utf8(http_headers, data)
-    use_strict_parser = result['encoding'] and True or False
-    if error is not None:
-        result['bozo'] = 1
-        result['bozo_exception'] = error
+        return result, f, None, http_headers
 
-    result['version'], data, entities = replace_doctype(data)
+    return result, f, data, http_headers
 
+def _base_uri_and_lang(result, http_headers):
     # Ensure that baseuri is an absolute URI using an acceptable URI scheme.
     contentloc = http_headers.get('content-location', '')
     href = result.get('href', '')
@@ -3935,38 +4545,311 @@ def parse(url_file_stream_or_string, etag=None, modified=None, agent=None, refer
     baselang = http_headers.get('content-language', None)
     if not isinstance(baselang, str) and baselang is not None:
         baselang = baselang.decode('utf-8', 'ignore')
+    return baseuri, baselang
+
+def _parse_data(result, data, http_headers, entry_callback=None, fields=None, compact=False, max_entries=None, since=None):
+    '''Parse the whole document data read by _read_resource into result.'''
+    baseuri, baselang = _base_uri_and_lang(result, http_headers)
+
+    data, result['encoding'], error = convert_to_utf8(http_headers, data)
+    use_strict_parser = result['encoding'] and True or False
+    if error is not None:
+        result['bozo'] = 1
+        result['bozo_exception'] = error
+
+    result['version'], data, entities = replace_doctype(data)
 
     if not _XML_AVAILABLE:
         use_strict_parser = 0
+    feedparser = None
     if use_strict_parser:
         # initialize the SAX parser
         feedparser = _StrictFeedParser(baseuri, baselang, 'utf-8')
-        saxparser = xml.sax.make_parser(PREFERRED_XML_PARSERS)
-        saxparser.setFeature(xml.sax.handler.feature_namespaces, 1)
-        try:
-            # disable downloading external doctype references, if possible
-            saxparser.setFeature(xml.sax.handler.feature_external_ges, 0)
-        except xml.sax.SAXNotSupportedException:
-            pass
-        saxparser.setContentHandler(feedparser)
-        saxparser.setErrorHandler(feedparser)
+        feedparser.entry_callback = entry_callback
+        feedparser.projection = _projection_elements(fields)
+        feedparser.compact = compact
+        feedparser.max_entries = max_entries
+        feedparser.since = since
+        saxparser = _make_sax_parser(feedparser)
         source = xml.sax.xmlreader.InputSource()
         source.setByteStream(_StringIO(data))
         try:
             saxparser.parse(source)
+        except _StopParsing:
+            pass
         except xml.sax.SAXException as e:
             result['bozo'] = 1
             result['bozo_exception'] = feedparser.exc or e
             use_strict_parser = 0
     if not use_strict_parser and _SGML_AVAILABLE:
+        # start over with the lenient parser, without reporting again the
+        # entries the strict parser got through before it failed
+        reported = feedparser is not None and feedparser.entries_reported or 0
         feedparser = _LooseFeedParser(baseuri, baselang, 'utf-8', entities)
-        feedparser.feed(data.decode('utf-8', 'replace'))
+        feedparser.entry_callback = entry_callback
+        feedparser.entries_reported = reported
+        feedparser.projection = _projection_elements(fields)
+        feedparser.compact = compact
+        feedparser.max_entries = max_entries
+        feedparser.since = since
+        try:
+            feedparser.feed(data.decode('utf-8', 'replace'))
+        except _StopParsing:
+            pass
+        except Exception as e:
+            # the lenient parser is the last resort for broken documents;
+            # return what it got through instead of failing the whole parse
+            result['bozo'] = 1
+            result['bozo_exception'] = e
+    if feedparser is None:
+        return result
     result['feed'] = feedparser.feeddata
-    result['entries'] = feedparser.entries
+    result['entries'] = compact and _compact_entries(feedparser.entries) or feedparser.entries
     result['version'] = result['version'] or feedparser.version
     result['namespaces'] = feedparser.namespacesInUse
     return result
 
+def parse_many(sources, workers=None, agent=None, referrer=None, handlers=None, request_headers=None, response_headers=None, fields=None, compact=False, transport=None, max_entries=None, since=None, download_workers=PARSE_MANY_DOWNLOAD_WORKERS):
+    '''Parse several feeds from URLs, files, streams, or strings.
+
+    Up to download_workers sources are read at a time in threads, and each
+    document is handed to a pool of up to workers processes (one per CPU by
+    default) as soon as it has been read, whatever the order its download
+    finishes in, so that parsing, which holds the GIL, runs on every core.  With workers=1, or where no process pool can
+    be started, the documents are parsed in this process instead.  The
+    other arguments are passed to parse() for every source.
+
+    :return: A list of :class:`FeedParserDict`, one per source, in the order
+             of sources.
+    '''
+    sources = list(sources)
+    if not sources:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    since = _date_horizon(since)
+
+    def read(source):
+        return _read_resource(source, None, None, agent, referrer, handlers, request_headers, response_headers, False, transport)
+
+    pool = None
+    if workers > 1:
+        try:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            # start the worker processes before the download threads, as
+            # forking while other threads are running is not safe
+            pool.submit(int).result()
+        except Exception:
+            # e.g. no working multiprocessing semaphores on this platform
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool = None
+    # for each source, its result, or a (future, arguments to _parse_data)
+    # pair; downloads are handled in the order they finish, so one slow
+    # source doesn't hold up parsing the others
+    pending = [None] * len(sources)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(download_workers, len(sources))) as downloads:
+            reads = dict((downloads.submit(read, source), index) for index, source in enumerate(sources))
+            for done in concurrent.futures.as_completed(reads):
+                result, f, data, http_headers = done.result()
+                args = (result, data, http_headers, None, fields, compact, max_entries, since)
+                if data is None:
+                    pending[reads[done]] = result
+                elif pool is not None:
+                    pending[reads[done]] = (pool.submit(_parse_data, *args), args)
+                else:
+                    pending[reads[done]] = _parse_data(*args)
+        results = []
+        for item in pending:
+            if isinstance(item, tuple):
+                future, args = item
+                try:
+                    item = future.result()
+                except Exception:
+                    # the worker process died, or the result could not be
+                    # sent back; parse it here instead
+                    item = _parse_data(*args)
+            results.append(item)
+        return results
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+if _XML_AVAILABLE:
+    class _SavedLocator(xml.sax.xmlreader.Locator):
+        '''Where a SAX parser was when it reported an error, kept so that the
+        SAXParseException can be pickled without the parser itself.'''
+        def __init__(self, publicId, systemId, lineNumber, columnNumber):
+            self.publicId = publicId
+            self.systemId = systemId
+            self.lineNumber = lineNumber
+            self.columnNumber = columnNumber
+
+        def getColumnNumber(self):
+            return self.columnNumber
+
+        def getLineNumber(self):
+            return self.lineNumber
+
+        def getPublicId(self):
+            return self.publicId
+
+        def getSystemId(self):
+            return self.systemId
+
+    def _reduce_sax_parse_exception(e):
+        # results from parse_many() workers carry these as bozo_exception
+        locator = _SavedLocator(e.getPublicId(), e.getSystemId(), e.getLineNumber(), e.getColumnNumber())
+        return xml.sax.SAXParseException, (e.getMessage(), e.getException(), locator)
+    copyreg.pickle(xml.sax.SAXParseException, _reduce_sax_parse_exception)
+
+def _make_sax_parser(feedparser):
+    '''Create a namespace-aware SAX parser that reports to feedparser.'''
+    saxparser = xml.sax.make_parser(PREFERRED_XML_PARSERS)
+    saxparser.setFeature(xml.sax.handler.feature_namespaces, 1)
+    try:
+        # disable downloading external doctype references, if possible
+        saxparser.setFeature(xml.sax.handler.feature_external_ges, 0)
+    except xml.sax.SAXNotSupportedException:
+        pass
+    saxparser.setContentHandler(feedparser)
+    saxparser.setErrorHandler(feedparser)
+    return saxparser
+
+def _iter_stream(f, data, http_headers):
+    '''Yield the body of the open resource f, starting with the data already
+    read from it, undoing any gzip or deflate content-encoding as it goes.'''
+    decompressor = None
+    if zlib and http_headers:
+        content_encoding = http_headers.get('content-encoding', '')
+        if 'gzip' in content_encoding:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif 'deflate' in content_encoding:
+            decompressor = zlib.decompressobj()
+    started = False
+    while data:
+        if decompressor is None:
+            yield data
+        else:
+            try:
+                chunk = decompressor.decompress(data, STREAMING_CHUNK_SIZE)
+            except zlib.error:
+                if started or 'deflate' not in http_headers.get('content-encoding', ''):
+                    raise
+                # The data may have no headers and no checksum.
+                decompressor = zlib.decompressobj(-15)
+                chunk = decompressor.decompress(data, STREAMING_CHUNK_SIZE)
+            started = True
+            # keep each decompressed chunk to about STREAMING_CHUNK_SIZE too
+            while chunk:
+                yield chunk
+                chunk = decompressor.decompress(decompressor.unconsumed_tail, STREAMING_CHUNK_SIZE)
+        data = f.read(STREAMING_CHUNK_SIZE)
+    if decompressor is not None:
+        chunk = decompressor.flush()
+        if chunk:
+            yield chunk
+
+def _parse_stream(result, f, data, http_headers, baseuri, baselang, entry_callback, fields, compact, max_entries, since):
+    '''Finish parse() for streaming=True.
+
+    The document is decoded with an incremental decoder for the encoding
+    chosen from its first chunks, and every decoded chunk is re-encoded to
+    utf-8 and fed to an incremental SAX parser straight away.'''
+    chunks = _iter_stream(f, data, http_headers)
+    read_errors = zlib and (IOError, zlib.error) or (IOError,)
+    feedparser = _StrictFeedParser(baseuri, baselang, 'utf-8')
+    feedparser.entry_callback = entry_callback
+    feedparser.projection = _projection_elements(fields)
+    feedparser.compact = compact
+    feedparser.max_entries = max_entries
+    feedparser.since = since
+    saxparser = _make_sax_parser(feedparser)
+    if not isinstance(saxparser, xml.sax.xmlreader.IncrementalParser):
+        # the preferred parser can't be fed piecemeal; parse it all at once
+        saxparser = None
+    try:
+        # Read until the first element has started, so that the encoding can
+        # be sniffed and the DOCTYPE replaced exactly as for a whole document.
+        head = _s2bytes('')
+        for chunk in chunks:
+            head += chunk
+            if RE_ELEMENT_START.search(head):
+                break
+        head, bom_encoding, xml_encoding, rfc3023_encoding, error = _sniff_encoding(http_headers, head)
+        decoder = None
+        proposed_encodings = [rfc3023_encoding, xml_encoding, bom_encoding]
+        if chardet:
+            proposed_encodings.append(_chardet_encoding(head))
+        for proposed_encoding in proposed_encodings + ['utf-8', 'windows-1252', 'iso-8859-2']:
+            if not proposed_encoding:
+                continue
+            try:
+                decoder = codecs.getincrementaldecoder(proposed_encoding)()
+                text = decoder.decode(head)
+            except (UnicodeDecodeError, LookupError):
+                decoder = None
+            else:
+                break
+        if decoder is None:
+            error = CharacterEncodingUnknown(
+                'document encoding unknown, I tried ' +
+                '%s, %s, utf-8, windows-1252, and iso-8859-2 but nothing worked' %
+                (rfc3023_encoding, xml_encoding))
+            result['encoding'] = ''
+        else:
+            if proposed_encoding != rfc3023_encoding:
+                error = CharacterEncodingOverride(
+                    'document declared as %s, but parsed as %s' %
+                    (rfc3023_encoding, proposed_encoding))
+            result['encoding'] = proposed_encoding
+        if error is not None:
+            result['bozo'] = 1
+            result['bozo_exception'] = error
+        if decoder is None:
+            return result
+
+        result['version'], head, entities = replace_doctype(_replace_xml_declaration(text).encode('utf-8'))
+        pieces = [head]
+        if saxparser is not None:
+            saxparser.feed(head)
+            pieces = None
+        for chunk in chunks:
+            try:
+                text = decoder.decode(chunk)
+            except UnicodeDecodeError as e:
+                result['bozo'] = 1
+                result['bozo_exception'] = e
+                decoder.errors = 'replace'
+                text = decoder.decode(chunk)
+            if saxparser is not None:
+                saxparser.feed(text.encode('utf-8'))
+            else:
+                pieces.append(text.encode('utf-8'))
+        text = decoder.decode(_s2bytes(''), True)
+        if saxparser is not None:
+            saxparser.feed(text.encode('utf-8'))
+            saxparser.close()
+        else:
+            pieces.append(text.encode('utf-8'))
+            saxparser = _make_sax_parser(feedparser)
+            source = xml.sax.xmlreader.InputSource()
+            source.setByteStream(_StringIO(_s2bytes('').join(pieces)))
+            saxparser.parse(source)
+    except _StopParsing:
+        pass
+    except xml.sax.SAXException as e:
+        result['bozo'] = 1
+        result['bozo_exception'] = feedparser.exc or e
+    except read_errors as e:
+        result['bozo'] = 1
+        result['bozo_exception'] = e
+    result['feed'] = feedparser.feeddata
+    result['entries'] = compact and _compact_entries(feedparser.entries) or feedparser.entries
+    result['version'] = result.get('version') or feedparser.version
+    result['namespaces'] = feedparser.namespacesInUse
+    return result
+
 # The list of EPSG codes for geographic (latitude/longitude) coordinate
 # systems to support decoding of GeoRSS GML profiles.
 _geogCS = [
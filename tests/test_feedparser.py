@@ -0,0 +1,116 @@
+import unittest
+
+import feedparser
+
+
+class LooseParserErrorsTest(unittest.TestCase):
+    '''Broken documents the lenient parser used to raise on.'''
+
+    def test_charref_out_of_range(self):
+        doc = ('<rss version="2.0"><channel><title>A &#x110000; & b</title>'
+               '<item><title>t &#99999999999; &#xD800; x</title></item>'
+               '</channel></rss>')
+        result = feedparser.parse(doc)
+        self.assertTrue(result.bozo)
+        self.assertEqual(result.feed.title, 'A � & b')
+        self.assertEqual(result.entries[0].title, 't � � x')
+
+    def test_link_end_tag_without_links(self):
+        # the entry closes before its link, so the link ends in the feed,
+        # which has no links
+        doc = ('<rss version="2.0"><channel><title>c &</title>'
+               '<item><title>t</title><link>http://example.org/</item></link>'
+               '<item><title>u</title></item></channel></rss>')
+        result = feedparser.parse(doc)
+        self.assertTrue(result.bozo)
+        self.assertEqual([e.title for e in result.entries], ['t', 'u'])
+        self.assertEqual(result.feed.link, 'http://example.org/')
+
+    def test_textinput_inside_entry(self):
+        doc = ('<rss version="2.0"><channel><title>c &</title>'
+               '<item><textinput><link>http://example.org/</link></textinput></item>'
+               '<item><title>u</title></item></channel></rss>')
+        result = feedparser.parse(doc)
+        self.assertTrue(result.bozo)
+        self.assertEqual(result.entries[-1].title, 'u')
+
+    def test_category_end_tag_without_tags(self):
+        doc = ('<rss version="2.0"><channel><title>c &</title>'
+               '<item><title>t</title><category>a</item></category>'
+               '</channel></rss>')
+        result = feedparser.parse(doc)
+        self.assertTrue(result.bozo)
+        self.assertEqual(result.feed.tags[0].term, 'a')
+
+    def test_unexpected_error_is_reported(self):
+        def fail(self, attrsD):
+            raise RuntimeError('boom')
+        start_title = feedparser._LooseFeedParser._start_title
+        feedparser._LooseFeedParser._start_title = fail
+        try:
+            result = feedparser.parse('<rss version="2.0"><channel>'
+                                      '<item><title>t &</title></item>'
+                                      '</channel></rss>')
+        finally:
+            feedparser._LooseFeedParser._start_title = start_title
+        self.assertTrue(result.bozo)
+        self.assertIsInstance(result.bozo_exception, RuntimeError)
+        self.assertEqual(len(result.entries), 1)
+
+
+class ProjectionTest(unittest.TestCase):
+    '''parse(fields=...) reads the projected fields as a full parse does.'''
+
+    fields = ['title', 'link', 'published']
+
+    def assertProjected(self, items, channel=''):
+        doc = ('<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">'
+               '<channel><title>c</title>%s%s</channel></rss>' % (channel, items))
+        full = feedparser.parse(doc)
+        projected = feedparser.parse(doc, fields=self.fields)
+        self.assertTrue(full.entries)
+        self.assertEqual([[e.get(k) for k in self.fields] for e in projected.entries],
+                         [[e.get(k) for k in self.fields] for e in full.entries])
+        self.assertEqual(projected.feed.get('title'), full.feed.get('title'))
+        return projected
+
+    def test_source_then_media_title(self):
+        result = self.assertProjected(
+            '<item><title>A</title><source url="http://example.org/s">S</source>'
+            '<media:title>M</media:title><link>http://example.org/1</link></item>'
+            '<item><title>B</title><link>http://example.org/2</link></item>')
+        self.assertEqual(result.entries[0].title, 'M')
+
+    def test_void_tags_in_skipped_element(self):
+        items = ''.join('<item><title>T%d</title><description>%s</description>'
+                        '<pubDate>Mon, 06 Sep 2021 16:45:00 GMT</pubDate></item>'
+                        % (i, i == 2 and 'Line one<br>line two <img src=x.png>' or 'd')
+                        for i in range(6))
+        result = self.assertProjected(items)
+        self.assertEqual(len(result.entries), 6)
+
+    def test_void_tag_in_channel(self):
+        items = ''.join('<item><title>T%d</title></item>' % i for i in range(12))
+        result = self.assertProjected(items, channel='<br>')
+        self.assertEqual(len(result.entries), 12)
+
+    def test_unclosed_tag_in_skipped_element(self):
+        self.assertProjected(
+            '<item><title>A</title><description><p>one</description>'
+            '<pubDate>Mon, 06 Sep 2021 16:45:00 GMT</pubDate></item>'
+            '<item><title>B</title><description>d</description></item>')
+
+    def test_void_tags_in_projected_element(self):
+        result = self.assertProjected(
+            '<item><title>A<br>b</title><link href="http://example.org/1"/>'
+            '<description>d</description></item>'
+            '<item><title>B<hr></title><description>d</description>'
+            '<link>http://example.org/2</link></item>')
+        self.assertEqual(result.entries[1].link, 'http://example.org/2')
+        # the elements after them are still projected
+        self.assertNotIn('summary', result.entries[0])
+        self.assertNotIn('summary', result.entries[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
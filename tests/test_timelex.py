@@ -0,0 +1,108 @@
+import itertools
+import random
+import unittest
+
+from dateutil.parser._parser import _timelex
+
+
+def lex(s):
+    # the original lexer, reading s one character at a time in get_token
+    return list(_timelex(s))
+
+
+class TimelexSplitTest(unittest.TestCase):
+    '''_timelex.split, which reads printable ASCII with one regex scan in
+    _split_ascii, splits every string as get_token does.'''
+
+    corpus = [
+        # ASCII
+        'Mon, 06 Sep 2021 16:45:00 +0000',
+        'Mon, 06 Sep 2021 16:45:00 GMT',
+        '2021-09-06T16:45:00Z',
+        '2021-09-06T10:00:00.123+02:00',
+        '20210906T164500',
+        'Sep.20.2009',
+        'Sep 20 2009 4:30:21.447',
+        'Thursday, 25-Sep-03 10:49:41 -0300',
+        '1996.July.10 AD 12:08 PM',
+        '3rd of May 2001',
+        '10-09-2003',
+        '10/09/03',
+        '-0300',
+        'a.b.c',
+        'a.1b',
+        '',
+        '   ',
+        # control characters and other whitespace
+        '06\tSep\n2021',
+        '06\x00Sep 2021',
+        '06\x0bSep\x1c2021\x0c',
+        # non-ASCII, which falls back on get_token
+        '06 Sept\xe9mbre 2021',
+        '\xe9 12',
+        '\xb23',
+        '２０２１-09-06',
+        '2021 09 06',
+        '06 Sep 2021 16:45 \xa0+0000',
+        # decimals split by '.' or ','
+        '4:30:21.447',
+        '10:00:00,123',
+        '16:45:00,5Z',
+        '1,5',
+        '12,5',
+        '12,a',
+        '12,',
+        '1.a',
+        '1.a ',
+        '1.5.',
+        '.5',
+        '5.',
+        '1..2',
+        '1.2.3',
+        '12.a.b',
+        '0.5,1',
+        # AM/PM
+        '4:30 PM',
+        '4:30PM',
+        '4:30 p.m.',
+        '4:30p.m.',
+        '12 a.m.',
+        '11.30pm',
+        '11.30 pm.',
+        'a.m.',
+        'am',
+        '12am 5 Sep',
+        '9.30 A.M. Sep 5',
+    ]
+
+    def assertSplit(self, s):
+        self.assertEqual(_timelex.split(s), lex(s), repr(s))
+
+    def test_corpus(self):
+        for s in self.corpus:
+            self.assertSplit(s)
+
+    def test_split_ascii(self):
+        for s in self.corpus:
+            if s.isascii() and s.isprintable():
+                self.assertEqual(_timelex._split_ascii(s), lex(s), repr(s))
+
+    def test_bytes(self):
+        self.assertEqual(_timelex.split(b'06 Sep 2021 4:30.5'),
+                         lex('06 Sep 2021 4:30.5'))
+
+    def test_exhaustive(self):
+        for length in range(1, 6):
+            for chars in itertools.product('a1.,- ', repeat=length):
+                self.assertSplit(''.join(chars))
+
+    def test_random(self):
+        rnd = random.Random(3)
+        alphabet = 'aZ09.,.,: -+\t\n\x00\x1c\x0b/()1234567890abcpmXYZ.\xe9'
+        for _ in range(20000):
+            self.assertSplit(''.join(rnd.choice(alphabet)
+                                     for _ in range(rnd.randint(1, 16))))
+
+
+if __name__ == '__main__':
+    unittest.main()